@@ -0,0 +1,224 @@
+"""API HTTP (JSON) do comparador, para outros serviços usarem sem o Streamlit.
+
+Uso:
+    python api.py --port 8000 --workers 4 --queue 16
+    curl 'http://localhost:8000/compare?q=notebook+dell&k=5'
+
+Rotas:
+    GET /compare?q=<produto>&k=<quantos>   os K mais baratos, em JSON
+    GET /suggest?q=<começo>&n=<quantas>    consultas já buscadas (ou do catálogo) com esse começo
+    GET /health                            estado e contadores do serviço
+
+Pedidos iguais em andamento são juntados (single-flight): 50 clientes pedindo
+"Notebook Dell" ao mesmo tempo disparam uma busca só e recebem a mesma
+resposta. Buscas diferentes simultâneas são limitadas a workers + queue;
+acima disso a API responde 503 com Retry-After em vez de enfileirar sem fim.
+As consultas são comparadas na forma canônica ("IPHONE13" = "iphone 13"), e
+/suggest, feito para ser chamado a cada tecla, leva a quem digita até elas.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from comparador import PriceComparator
+from comparador.queries import get_query_index, normalize_query
+
+MAX_K = 200
+MAX_SUGGESTIONS = 20
+
+
+class Saturated(Exception):
+    """Todas as vagas de busca estão ocupadas"""
+
+
+class SingleFlight:
+    """Junta chamadas iguais em andamento: só a primeira executa, as outras esperam o mesmo Future"""
+
+    def __init__(self, executor, max_pending):
+        self.executor = executor
+        self.max_pending = max_pending
+        self._calls = {}   # chave -> Future
+        self._lock = threading.Lock()
+        self.stats = {'started': 0, 'coalesced': 0, 'rejected': 0}
+
+    def submit(self, key, func, *args):
+        """Retorna (future, juntou_com_outra); levanta Saturated se não há vaga"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future, True
+            if len(self._calls) >= self.max_pending:
+                self.stats['rejected'] += 1
+                raise Saturated(key)
+            future = self.executor.submit(func, *args)
+            self._calls[key] = future
+            self.stats['started'] += 1
+
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future, False
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class ComparisonService:
+    def __init__(self, workers=4, queue=16, comparator_factory=PriceComparator):
+        self.workers = workers
+        self.comparator_factory = comparator_factory
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api-busca')
+        self.flights = SingleFlight(self.executor, max_pending=workers + queue)
+        # Quem espera desiste um pouco depois do prazo global da própria busca
+        self.timeout = PriceComparator.DEFAULT_GLOBAL_TIMEOUT + 5
+        self.started_at = time.time()
+
+    def compare(self, query, k):
+        # Um comparador por busca: o estado (ex: lojas puladas) não se mistura entre pedidos
+        comparator = self.comparator_factory(max_results=k)
+        return {
+            'results': comparator.find_cheapest(query),
+            'skipped_sites': comparator.skipped_sites,
+        }
+
+    def request(self, query, k):
+        """Resposta da busca (juntando com uma igual em andamento); pode levantar Saturated"""
+        future, coalesced = self.flights.submit((normalize_query(query), k), self.compare, query, k)
+        return dict(future.result(timeout=self.timeout), coalesced=coalesced)
+
+    def suggest(self, prefix, limit):
+        return get_query_index().suggest(prefix, limit)
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'uptime_s': round(time.time() - self.started_at),
+            'workers': self.workers,
+            'in_flight': self.flights.in_flight(),
+            'max_pending': self.flights.max_pending,
+            **self.flights.stats,
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    # Keep-alive: clientes com muitas consultas reaproveitam a conexão
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        service = self.server.service
+
+        if url.path == '/health':
+            self.send_json(200, service.health())
+            return
+        if url.path == '/suggest':
+            self.suggest(service, parse_qs(url.query))
+            return
+        if url.path != '/compare':
+            self.send_json(404, {'error': 'rota não encontrada'})
+            return
+
+        params = parse_qs(url.query)
+        query = params.get('q', [''])[0].strip()
+        if not query:
+            self.send_json(400, {'error': 'informe o produto em ?q='})
+            return
+        try:
+            k = min(MAX_K, max(1, int(params.get('k', [PriceComparator.DEFAULT_MAX_RESULTS])[0])))
+        except ValueError:
+            self.send_json(400, {'error': 'k precisa ser um número'})
+            return
+
+        start = time.perf_counter()
+        try:
+            response = service.request(query, k)
+        except Saturated:
+            self.send_json(503, {'error': 'serviço ocupado, tente de novo'}, headers={'Retry-After': '1'})
+            return
+        except FutureTimeout:
+            self.send_json(504, {'error': 'a busca passou do prazo'})
+            return
+        except Exception as e:
+            self.send_json(500, {'error': str(e)})
+            return
+
+        self.send_json(200, {
+            'query': query,
+            'k': k,
+            'took_ms': round((time.perf_counter() - start) * 1000, 1),
+            **response,
+        })
+
+    def suggest(self, service, params):
+        prefix = params.get('q', [''])[0]
+        try:
+            limit = min(MAX_SUGGESTIONS, max(1, int(params.get('n', [5])[0])))
+        except ValueError:
+            self.send_json(400, {'error': 'n precisa ser um número'})
+            return
+        start = time.perf_counter()
+        suggestions = service.suggest(prefix, limit)
+        self.send_json(200, {
+            'query': normalize_query(prefix),
+            'took_ms': round((time.perf_counter() - start) * 1000, 3),
+            'suggestions': suggestions,
+        })
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host='127.0.0.1', port=8000, service=None):
+    """Servidor pronto para serve_forever() (port=0 escolhe uma porta livre)"""
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    server.service = service or ComparisonService()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP do comparador de preços")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=4, help="Buscas diferentes rodando ao mesmo tempo")
+    parser.add_argument('--queue', type=int, default=16, help="Buscas esperando vaga antes de responder 503")
+    args = parser.parse_args(argv)
+
+    service = ComparisonService(workers=args.workers, queue=args.queue)
+    # O índice de sugestões é montado antes do primeiro pedido (lê histórico e cache)
+    get_query_index()
+    server = make_server(args.host, args.port, service)
+    print(f"API em http://{args.host}:{server.server_address[1]}/compare?q=produto")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando")
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""Modo batch: compara preços de um catálogo inteiro sem a interface do Streamlit.
+
+Uso:
+    python batch.py produtos.csv resultados.csv
+    python batch.py produtos.jsonl resultados.parquet --concurrency 32 --per-site 4 --top 5
+    python batch.py produtos.csv resultados.csv --extract-workers 8
+
+A entrada é um CSV (coluna "query" ou "produto"; sem elas, a primeira coluna)
+ou um JSONL com a chave "query". Um campo "id" opcional identifica a linha.
+Consultas com resultado no cache (do app, da API ou de outra rodada) não
+voltam às lojas. Cada consulta terminada vai direto para a saída e para o
+checkpoint, então rodar de novo o mesmo comando continua de onde parou. Cada
+consulta gera uma linha para cada um dos K produtos mais baratos (somando todos os sites); a
+coluna "grupo" junta anúncios do mesmo produto, inclusive entre consultas, e
+menor preço, melhor site e economia são calculados dentro do grupo principal.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from comparador import PriceComparator
+from comparador.extraction import ExtractionPool
+from comparador.ranking import TopK
+from comparador.matching import ProductIndex, comparison_group, query_filter
+
+OUTPUT_COLUMNS = ['id', 'query', 'site', 'produto', 'preco', 'link', 'grupo',
+                  'menor_preco', 'melhor_site', 'economia_percent']
+
+
+def read_queries(path):
+    """Lê (id, consulta) do CSV ou JSONL, uma linha por vez"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    item = json.loads(line)
+                    yield str(item.get('id', line_number)), item['query']
+        else:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            if 'query' in header:
+                column = header.index('query')
+            elif 'produto' in header:
+                column = header.index('produto')
+            else:
+                # Sem cabeçalho conhecido: a primeira linha também é consulta
+                column = 0
+                yield '1', header[0]
+            id_column = header.index('id') if 'id' in header else None
+            for line_number, row in enumerate(reader, 2):
+                if row and row[column].strip():
+                    row_id = row[id_column] if id_column is not None else str(line_number)
+                    yield row_id, row[column]
+
+
+class CsvOutput:
+    def __init__(self, path):
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=OUTPUT_COLUMNS)
+        if not exists:
+            self.writer.writeheader()
+
+    def write(self, rows):
+        """Grava as linhas; retorna True quando já estão no disco"""
+        self.writer.writerows(rows)
+        self.file.flush()
+        return True
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetOutput:
+    """Grava em row groups; ao retomar, continua num arquivo novo (resultados.1.parquet, ...)"""
+
+    def __init__(self, path, row_group_size=5000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Para gravar Parquet instale o pyarrow: pip install pyarrow")
+
+        base, ext = os.path.splitext(path)
+        part = 0
+        while os.path.exists(path):
+            part += 1
+            path = f"{base}.{part}{ext}"
+
+        self.pa = pa
+        self.schema = pa.schema([
+            ('id', pa.string()), ('query', pa.string()), ('site', pa.string()),
+            ('produto', pa.string()), ('preco', pa.float64()), ('link', pa.string()), ('grupo', pa.int64()),
+            ('menor_preco', pa.float64()), ('melhor_site', pa.string()),
+            ('economia_percent', pa.float64()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.row_group_size = row_group_size
+        self.buffer = []
+
+    def write(self, rows):
+        """Grava as linhas; retorna True quando já estão no disco"""
+        self.buffer.extend(rows)
+        if len(self.buffer) >= self.row_group_size:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        if self.buffer:
+            self.writer.write_table(self.pa.Table.from_pylist(self.buffer, schema=self.schema))
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def open_output(path):
+    if path.endswith('.parquet'):
+        return ParquetOutput(path)
+    return CsvOutput(path)
+
+
+class Checkpoint:
+    """Arquivo com os ids já processados, um por linha"""
+
+    def __init__(self, path):
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.done = {line.rstrip('\n') for line in f if line.strip()}
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def mark(self, query_id):
+        self.done.add(query_id)
+        self.file.write(query_id + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class BatchRunner:
+    def __init__(self, comparator, concurrency=16, per_site_concurrency=4):
+        self.comparator = comparator
+        self.concurrency = concurrency
+        self.site_limits = defaultdict(lambda: threading.BoundedSemaphore(per_site_concurrency))
+        self.site_stats = defaultdict(lambda: {'ok': 0, 'total': 0})
+        self.processed = 0
+        # Índice de anúncios da execução inteira: o mesmo produto tem o mesmo grupo em qualquer consulta
+        self.product_index = ProductIndex()
+        # Consultas gravadas na saída mas ainda não no disco (fora do checkpoint)
+        self.unsaved_ids = []
+
+    def search_site(self, site_name, search_func, query):
+        # Resultado no cache (como no app): não ocupa a vaga da loja
+        cached = self.comparator.cached_products(site_name, search_func, query)
+        if cached is not None:
+            return cached
+        # Limite por site: uma loja lenta não ocupa todos os workers
+        with self.site_limits[site_name]:
+            try:
+                return self.comparator.search_and_cache(site_name, search_func, query)
+            except Exception as e:
+                print(f"Erro ao buscar '{query}' no {site_name}: {e}")
+                return []
+
+    def build_rows(self, query_id, query, results):
+        if not results:
+            return [{'id': query_id, 'query': query}]
+
+        stats = self.comparator.deal_stats(comparison_group(results, query))
+        return [{
+            'id': query_id,
+            'query': query,
+            'site': result['site'],
+            'produto': result['produto'],
+            'preco': result['preco'],
+            'link': result['link'],
+            'grupo': self.product_index.add(result['produto']),
+            'menor_preco': stats['min_price'],
+            'melhor_site': stats['best_deal']['site'],
+            'economia_percent': round(stats['savings_percent'], 2),
+        } for result in results]
+
+    def run(self, queries, output, checkpoint):
+        search_functions = self.comparator.get_search_functions()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        pending = {}   # future -> (id, site)
+        states = {}    # id -> {'query', 'remaining', 'top'}
+
+        def collect(done):
+            for future in done:
+                query_id, site_name = pending.pop(future)
+                state = states[query_id]
+                products = future.result()
+                self.site_stats[site_name]['total'] += 1
+                if products:
+                    self.site_stats[site_name]['ok'] += 1
+                    # Só o produto buscado disputa o ranking (sem capas nem outros modelos)
+                    state['top'].extend(filter(state['is_wanted'], products))
+                state['remaining'] -= 1
+
+                if state['remaining'] == 0:
+                    self.unsaved_ids.append(query_id)
+                    if output.write(self.build_rows(query_id, state['query'], state['top'].items())):
+                        for saved_id in self.unsaved_ids:
+                            checkpoint.mark(saved_id)
+                        self.unsaved_ids = []
+                    del states[query_id]
+                    self.processed += 1
+
+        try:
+            for query_id, query in queries:
+                if query_id in checkpoint.done or query_id in states:
+                    continue
+
+                # Janela limitada: o catálogo nunca fica todo na memória
+                while len(pending) >= self.concurrency * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+                states[query_id] = {'query': query, 'remaining': len(search_functions),
+                                    'top': TopK(self.comparator.max_results), 'is_wanted': query_filter(query)}
+                for site_name, search_func in search_functions:
+                    future = executor.submit(self.search_site, site_name, search_func, query)
+                    pending[future] = (query_id, site_name)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparação de preços em lote (sem Streamlit)")
+    parser.add_argument('input', help="CSV ou JSONL com as consultas")
+    parser.add_argument('output', help="Arquivo de saída (.csv ou .parquet)")
+    parser.add_argument('--concurrency', type=int, default=16, help="Buscas simultâneas no total")
+    parser.add_argument('--per-site', type=int, default=4, help="Buscas simultâneas por site")
+    parser.add_argument('--top', type=int, default=PriceComparator.DEFAULT_MAX_RESULTS,
+                        help="Produtos mais baratos gravados por consulta")
+    parser.add_argument('--checkpoint', help="Arquivo de checkpoint (padrão: <saída>.checkpoint)")
+    parser.add_argument('--no-cache', action='store_true', help="Não lê nem grava o cache de resultados")
+    parser.add_argument('--no-history', action='store_true', help="Não grava o histórico de preços")
+    parser.add_argument('--no-archive', action='store_true', help="Não arquiva as páginas baixadas")
+    parser.add_argument('--extract-workers', type=int, default=0,
+                        help="Processos que extraem as páginas (0 extrai nas threads de busca)")
+    args = parser.parse_args(argv)
+
+    # O parsing é puro Python: com muitas buscas simultâneas, processos usam os outros núcleos
+    pool = ExtractionPool(args.extract_workers) if args.extract_workers else None
+    comparator = PriceComparator(use_cache=not args.no_cache, max_results=args.top,
+                                 use_history=not args.no_history, use_archive=not args.no_archive,
+                                 extraction_pool=pool)
+    runner = BatchRunner(comparator, concurrency=args.concurrency, per_site_concurrency=args.per_site)
+    checkpoint = Checkpoint(args.checkpoint or args.output + '.checkpoint')
+    already_done = len(checkpoint.done)
+    output = open_output(args.output)
+
+    start = time.monotonic()
+    try:
+        runner.run(read_queries(args.input), output, checkpoint)
+    except KeyboardInterrupt:
+        print("\nInterrompido - rode o mesmo comando para continuar do checkpoint")
+    finally:
+        output.close()
+        if pool:
+            pool.close()
+        for query_id in runner.unsaved_ids:
+            checkpoint.mark(query_id)
+        checkpoint.close()
+
+    elapsed = time.monotonic() - start
+    print(f"\nConsultas processadas: {runner.processed} (já feitas antes: {already_done})")
+    print(f"Tempo: {elapsed:.1f}s - {runner.processed / elapsed if elapsed else 0:.2f} consultas/s")
+    print("Sucesso por site:")
+    for site_name, stats in sorted(runner.site_stats.items()):
+        rate = stats['ok'] / stats['total'] * 100 if stats['total'] else 0
+        print(f"  {site_name:<16} {stats['ok']}/{stats['total']} ({rate:.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
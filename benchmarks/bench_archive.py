@@ -0,0 +1,80 @@
+"""Arquivo de páginas contra as lojas simuladas: 200 x 304, deduplicação e replay.
+
+Primeira rodada: cada consulta baixa, extrai e arquiva as páginas. Segunda
+rodada: os pedidos vão condicionais, a loja responde 304 e os produtos vêm
+do arquivo, sem download nem extração.
+
+Uso:
+    python benchmarks/bench_archive.py
+    python benchmarks/bench_archive.py --queries 50 --latency 100
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comparador import PriceComparator, metrics  # noqa: E402
+from comparador.page_archive import PageArchive  # noqa: E402
+from comparador.rate_limit import get_scheduler  # noqa: E402
+from replay import replay  # noqa: E402
+from run_benchmarks import percentile  # noqa: E402
+from stub_server import start_stub_server, stub_search_urls  # noqa: E402
+
+
+def run_round(comparator, queries):
+    """(latências, KB baixados, produtos) de uma busca por consulta"""
+    latencies, received_kb, found = [], 0.0, 0
+    sites = len(comparator.get_search_functions())
+    for query in queries:
+        start = time.perf_counter()
+        found += sum(len(products) for _, products in comparator.iter_search_results(query) if products)
+        latencies.append(time.perf_counter() - start)
+        # Os traces mais recentes são os das lojas desta busca
+        received_kb += sum(row['kb'] for row in metrics.recent_traces()[:sites])
+    return latencies, received_kb, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do arquivo de páginas")
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=50, help="Latência das lojas simuladas em ms")
+    args = parser.parse_args()
+
+    stub, base_url = start_stub_server(latency_ms=args.latency, seed=42)
+    get_scheduler().configure(urlsplit(base_url).netloc, rate=100_000, burst=100_000)
+    queries = [f"produto {i}" for i in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        comparator = PriceComparator(use_cache=False, use_history=False, search_urls=stub_search_urls(base_url))
+        comparator.archive = PageArchive(os.path.join(tmp, 'paginas.sqlite3'))
+
+        for label in ("Primeira rodada (200)", "Segunda rodada (304)"):
+            latencies, received_kb, found = run_round(comparator, queries)
+            print(f"{label}: p50 {percentile(latencies, 50) * 1000:.1f} ms | "
+                  f"p95 {percentile(latencies, 95) * 1000:.1f} ms | {received_kb:.0f} KB baixados | "
+                  f"{found} produtos")
+
+        stats = comparator.archive.stats()
+        print(f"Arquivo: {stats['fetches']} downloads ({stats['not_modified']} com 304) → "
+              f"{stats['pages']} páginas diferentes, {stats['size_bytes'] / 1024:.0f} KB de HTML em "
+              f"{stats['stored_bytes'] / 1024:.0f} KB")
+
+        start = time.perf_counter()
+        summary = replay(comparator.archive, comparator)
+        elapsed = time.perf_counter() - start
+        pages = sum(site['pages'] for site in summary.values())
+        changed = sum(site['changed'] for site in summary.values())
+        print(f"Replay sem rede: {pages} URLs extraídas de novo em {elapsed * 1000:.0f} ms "
+              f"({changed} com extração diferente da guardada)")
+        comparator.archive.close()
+
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Escala da extração em processos: páginas/s com 1 a N processos no ExtractionPool.
+
+As páginas são as gravadas em benchmarks/fixtures, repetidas até dar o
+total pedido, numa ordem que mistura as lojas. A linha "sem pool" extrai no
+próprio processo (como a busca do app); as outras mostram o ganho sobre ela e
+a eficiência (ganho / processos, 100% = escala linear). Também confere que o
+pool devolve exatamente os mesmos produtos.
+
+Uso:
+    python benchmarks/bench_extraction.py
+    python benchmarks/bench_extraction.py --pages 1000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comparador.extraction import ExtractionPool, extract_products  # noqa: E402
+from record_fixtures import FILENAMES  # noqa: E402
+from stub_server import FIXTURES_DIR  # noqa: E402
+
+
+def load_jobs(total):
+    """`total` jobs (loja, conteúdo, URL), alternando as páginas gravadas"""
+    pages = []
+    for site_name, filename in FILENAMES.items():
+        with open(os.path.join(FIXTURES_DIR, filename), 'rb') as f:
+            pages.append((site_name, f.read(), f'https://exemplo/{filename}'))
+    return [pages[i % len(pages)] for i in range(total)]
+
+
+def default_workers():
+    """1, 2, 4, ... até o número de núcleos (que sempre entra)"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Páginas/s da extração com 1 a N processos")
+    parser.add_argument('--pages', type=int, default=300, help="Páginas extraídas em cada rodada")
+    parser.add_argument('--workers', type=int, nargs='+', help="Quantidades de processos (padrão: 1, 2, 4... núcleos)")
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.pages)
+    megabytes = sum(len(content) for _, content, _ in jobs) / 1e6
+
+    start = time.perf_counter()
+    expected = [extract_products(*job) for job in jobs]
+    baseline = time.perf_counter() - start
+
+    print(f"{len(jobs)} páginas ({megabytes:.1f} MB) | {os.cpu_count()} núcleos")
+    print(f"{'processos':<11}{'páginas/s':>11}{'MB/s':>8}{'ganho':>8}{'eficiência':>12}")
+    print(f"{'sem pool':<11}{len(jobs) / baseline:>11.1f}{megabytes / baseline:>8.1f}{1:>7.2f}x{'-':>12}")
+
+    for workers in args.workers or default_workers():
+        with ExtractionPool(workers) as pool:
+            # Primeira rodada só sobe os processos (bs4 importado e planos compilados)
+            list(pool.imap(jobs[:workers]))
+            start = time.perf_counter()
+            results = [products for _, products in pool.imap(jobs)]
+            elapsed = time.perf_counter() - start
+        if results != expected:
+            sys.exit(f"ERRO: com {workers} processos a extração deu produtos diferentes")
+        speedup = baseline / elapsed
+        print(f"{workers:<11}{len(jobs) / elapsed:>11.1f}{megabytes / elapsed:>8.1f}{speedup:>7.2f}x"
+              f"{speedup / workers * 100:>11.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Histórico de preços com milhões de linhas: gravação, consulta por período e compactação.
+
+Uso:
+    python benchmarks/bench_history.py              # 2 milhões de linhas, banco temporário
+    python benchmarks/bench_history.py 5000000
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comparador.price_history import DAY, PriceHistory  # noqa: E402
+
+QUERIES = 2000
+SITES = ('Mercado Livre', 'Buscapé', 'Zoom', 'Google Shopping')
+
+
+def fill(history, rows, now, seed=42):
+    """Buscas espalhadas pelos últimos 180 dias, 20 produtos por busca"""
+    rng = np.random.default_rng(seed)
+    per_search = 20
+    for _ in range(rows // per_search):
+        query = f"produto {rng.integers(QUERIES)}"
+        site = SITES[rng.integers(len(SITES))]
+        recorded_at = now - rng.uniform(0, 180) * DAY
+        prices = rng.uniform(50, 5000, per_search).round(2)
+        history.append(query, [
+            {'site': site, 'produto': f"{query} modelo {i}", 'preco': float(price), 'link': None}
+            for i, price in enumerate(prices)
+        ], recorded_at=recorded_at)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    now = time.time()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = PriceHistory(os.path.join(tmp, 'historico.sqlite3'))
+
+        start = time.perf_counter()
+        fill(history, rows, now)
+        elapsed = time.perf_counter() - start
+        print(f"Gravação: {rows} linhas em {elapsed:.1f}s ({rows / elapsed:,.0f} linhas/s)")
+
+        for days in (30, 90):
+            samples = []
+            for i in range(200):
+                start = time.perf_counter()
+                history.stats(f"produto {i}", days, now=now)
+                samples.append(time.perf_counter() - start)
+            print(f"Estatísticas de {days} dias por consulta: mediana {statistics.median(samples) * 1000:.2f} ms"
+                  f" | pior {max(samples) * 1000:.2f} ms")
+
+        start = time.perf_counter()
+        removed = history.compact(older_than_days=90, now=now)
+        print(f"Compactação (> 90 dias): {removed} linhas removidas em {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Tempo de importação do núcleo (pacote comparador) e o que ele puxa junto.
+
+Roda `python -X importtime` num processo novo, mostra os módulos mais caros e
+falha (código 1) se passar do orçamento ou se carregar algo que só a interface
+ou uma busca de verdade deveriam carregar.
+
+Uso:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --budget-ms 150 --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENT = "from comparador import PriceComparator; PriceComparator(use_cache=False, use_history=False, use_archive=False)"
+# Módulos que não podem aparecer só por importar o núcleo e criar o comparador
+FORBIDDEN = ['streamlit', 'pandas', 'plotly', 'numpy', 'pyarrow', 'bs4', 'lxml', 'requests', 'urllib3']
+
+
+def import_times():
+    """({módulo: acumulado µs}, total µs, módulos carregados) de uma importação num processo novo"""
+    check = STATEMENT + "; import sys; print(','.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', check],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times, total = {}, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        top_level = not name[1:].startswith(' ')
+        name = name.strip()
+        if top_level and name == 'site':
+            # O que veio antes (e o próprio site) é a partida do interpretador
+            times, total = {}, 0
+            continue
+        times[name] = int(cumulative)
+        if top_level:
+            total += int(cumulative)
+    return times, total, set(result.stdout.strip().split(','))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação do pacote comparador")
+    parser.add_argument('--budget-ms', type=float, default=150, help="Máximo para importar o comparador")
+    parser.add_argument('--runs', type=int, default=5, help="Processos medidos (vale a mediana)")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    totals = [total / 1000 for _, total, _ in runs]
+    times, _, loaded = runs[-1]
+
+    print(f"Importar o comparador: mediana {statistics.median(totals):.1f} ms "
+          f"(mín {min(totals):.1f} | máx {max(totals):.1f}) em {args.runs} processos")
+    print("Mais caros (acumulado, última rodada):")
+    for name, cumulative in sorted(times.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative / 1000:7.1f} ms  {name}")
+
+    problems = []
+    heavy = [name for name in FORBIDDEN if name in loaded]
+    if heavy:
+        problems.append(f"módulos pesados carregados na importação: {', '.join(heavy)}")
+    if statistics.median(totals) > args.budget_ms:
+        problems.append(f"passou do orçamento de {args.budget_ms:.0f} ms")
+
+    for problem in problems:
+        print(f"FALHOU: {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Agrupamento de anúncios em escala: tempo por anúncio e qualidade dos grupos.
+
+Antes, confere que grafias diferentes da consulta ("iPhone13", "IPHONE 13 ",
+"Galaxy S 23") acham o anúncio do produto, como a chave do cache promete.
+
+Uso:
+    python benchmarks/bench_matching.py            # 200 mil anúncios sintéticos
+    python benchmarks/bench_matching.py 500000
+"""
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comparador.matching import ProductIndex, query_filter  # noqa: E402
+
+BRANDS = ['Apple', 'Samsung', 'Motorola', 'Xiaomi', 'Dell', 'Lenovo', 'LG', 'Sony', 'Logitech', 'JBL']
+KINDS = ['Smartphone', 'Notebook', 'Smart TV', 'Mouse Gamer', 'Fone Bluetooth', 'Monitor', 'Tablet']
+COLORS = ['Preto', 'Azul', 'Branco', 'Grafite', 'Prata']
+EXTRAS = ['Original', 'Lacrado', 'Nota Fiscal', 'Envio Imediato', 'Oferta', 'Garantia 1 Ano']
+ACCESSORIES = ['Capa para', 'Película de Vidro para', 'Carregador Turbo para', 'Suporte para']
+# (grafias da consulta, anúncio que todas precisam achar, anúncio que nenhuma pode achar)
+SPELLINGS = [
+    (['iPhone13', 'IPHONE 13 ', 'iphone  13'], 'Apple iPhone 13 (128 GB) - Meia-noite', 'Capa Silicone iPhone 13'),
+    (['Galaxy S 23', 'galaxy s23', 'GALAXY S23 '], 'Samsung Galaxy S23 128GB Preto', 'Samsung Galaxy S23 Ultra 256GB'),
+    (['Galaxy S23+', 'galaxy s 23 +'], 'Galaxy S23+ 256GB', 'Galaxy S23 256GB'),
+]
+
+
+def catalog(models, seed=7):
+    """Modelos com nomes únicos (dois ids com o mesmo nome seriam o mesmo produto)"""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < models:
+        names.add(f"{rng.choice(KINDS)} {rng.choice(BRANDS)} {rng.choice('ABCGMSXZ')}{rng.randint(10, 9999)}")
+    return [(model_id, name, f"{rng.choice([64, 128, 256, 512])}GB")
+            for model_id, name in enumerate(sorted(names))]
+
+
+def listing_title(rng, name, spec):
+    """Variações que as lojas fazem com o mesmo produto"""
+    words = [name, spec, rng.choice(COLORS)]
+    if rng.random() < 0.5:
+        words.append(rng.choice(EXTRAS))
+    if rng.random() < 0.3:
+        words[0], words[1] = words[1], words[0]
+    title = ' - '.join(words) if rng.random() < 0.5 else ' '.join(words)
+    return title.upper() if rng.random() < 0.1 else title
+
+
+def listings(count, seed=42):
+    """(título, modelo real, é acessório)"""
+    rng = random.Random(seed)
+    products = catalog(max(1, count // 20))
+    for _ in range(count):
+        model_id, name, spec = rng.choice(products)
+        if rng.random() < 0.15:
+            yield f"{rng.choice(ACCESSORIES)} {name}", model_id, True
+        else:
+            yield listing_title(rng, name, spec), model_id, False
+
+
+def check_spellings():
+    for spellings, title, other in SPELLINGS:
+        for spelling in spellings:
+            is_wanted = query_filter(spelling)
+            if not is_wanted({'produto': title}) or is_wanted({'produto': other}):
+                sys.exit(f"ERRO: a consulta {spelling!r} não separa {title!r} de {other!r}")
+    print(f"Grafias: {sum(len(s) for s, _, _ in SPELLINGS)} consultas acham o anúncio certo")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    check_spellings()
+    data = list(listings(count))
+
+    index = ProductIndex()
+    groups = []
+    checkpoints = {count // 4, count // 2, count - 1}
+    start = time.perf_counter()
+    last = start
+    for i, (title, _, _) in enumerate(data):
+        groups.append(index.add(title))
+        if i in checkpoints:
+            now = time.perf_counter()
+            print(f"  {i + 1:>8} anúncios: {(now - start) / (i + 1) * 1e6:6.1f} µs/anúncio no total")
+            last = now
+    elapsed = last - start
+    print(f"Indexação: {count} anúncios em {elapsed:.1f}s ({count / elapsed:,.0f}/s)")
+
+    # Pureza: quantos anúncios do grupo são do modelo (e tipo) mais comum dele
+    members = defaultdict(Counter)
+    for group, (_, model_id, accessory) in zip((index.group_of(g) for g in groups), data):
+        members[group][(model_id, accessory)] += 1
+    pure = sum(counter.most_common(1)[0][1] for counter in members.values())
+    print(f"Grupos: {len(members)} | pureza {pure / count * 100:.1f}% "
+          f"| modelos reais {len({(m, a) for _, m, a in data})}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Compara o tempo de parsing antes/depois da camada parsing.py.
+
+Uso:
+    python benchmarks/bench_parsing.py                 # páginas sintéticas
+    python benchmarks/bench_parsing.py paginas/        # páginas salvas (mercadolivre*.html, buscape*.html, zoom*.html)
+
+"Antes" reproduz o código original: página inteira no html.parser e, no
+Mercado Livre, a busca dos cards repetida para cada estratégia de seletor.
+"""
+import glob
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from comparador import PriceComparator  # noqa: E402
+from comparador.parsing import PARSER  # noqa: E402
+
+REPEAT = 5
+
+
+def legacy_mercadolivre(comparator, content, search_url):
+    soup = BeautifulSoup(content, 'html.parser')
+    selectors = [
+        {'title': 'h2.ui-search-item__title', 'price': '.andes-money-amount__fraction'},
+        {'title': '.ui-search-item__title', 'price': '.price-tag-fraction'},
+        {'title': 'h2', 'price': '[class*="price"], [class*="money"]'},
+    ]
+    for selector in selectors:
+        for product_div in soup.find_all('div', class_='ui-search-result__wrapper')[:3]:
+            title_elem = product_div.select_one(selector['title'])
+            price_elem = product_div.select_one(selector['price'])
+            if title_elem and price_elem:
+                price = comparator.clean_price(price_elem.get_text(strip=True))
+                if price and price > 0:
+                    return price
+    return None
+
+
+def legacy_buscape(comparator, content, search_url):
+    soup = BeautifulSoup(content, 'html.parser')
+    products = soup.find_all('div', class_='ProductCard_ProductCard_Inner__7JhKb')
+    if not products:
+        products = soup.find_all('div', {'data-testid': re.compile('product')})
+    for product_div in products[:3]:
+        title_elem = product_div.find('h2') or product_div.find('h3')
+        price_texts = product_div.find_all(string=re.compile(r'R\$\s*\d+'))
+        if title_elem and price_texts:
+            price = comparator.clean_price(price_texts[0])
+            if price and price > 0:
+                return price
+    return None
+
+
+def legacy_zoom(comparator, content, search_url):
+    soup = BeautifulSoup(content, 'html.parser')
+    price_elements = soup.find_all(string=re.compile(r'R\$\s*\d+'))
+    title_elements = soup.find_all(['h1', 'h2', 'h3', 'h4'])
+    if price_elements and title_elements:
+        return comparator.clean_price(price_elements[0])
+    return None
+
+
+def synthetic_page(site, cards=50, script_kb=300):
+    """Página parecida com as reais: muitos cards e muito JavaScript inline"""
+    script = '<script>window.__STATE__ = "' + 'x' * (script_kb * 1024) + '";</script>'
+    nav = '<nav>' + ''.join(f'<a href="/cat/{i}">Categoria {i}</a>' for i in range(200)) + '</nav>'
+    footer = '<footer>' + ''.join(f'<div class="f{i}"><span>Info {i}</span></div>' for i in range(3000)) + '</footer>'
+    items = []
+    for i in range(cards):
+        price = f'{1000 + i * 7:,}'.replace(',', '.')
+        if site == 'mercadolivre':
+            items.append(
+                f'<li><div class="ui-search-result__wrapper"><a href="/p/MLB{i}">'
+                f'<h2 class="ui-search-item__title">Produto {i}</h2></a>'
+                f'<span class="andes-money-amount__fraction">{price}</span></div></li>'
+            )
+        elif site == 'buscape':
+            items.append(
+                f'<a href="/produto/{i}"><div class="ProductCard_ProductCard_Inner__7JhKb">'
+                f'<h2>Produto {i}</h2><p>R$ {price},00</p></div></a>'
+            )
+        else:
+            items.append(f'<article><h3>Produto {i}</h3><span>R$ {price},90</span></article>')
+    return f'<html><head>{script}</head><body>{nav}<main>{"".join(items)}</main>{footer}</body></html>'.encode()
+
+
+def load_pages(directory):
+    pages = {}
+    for site in ('mercadolivre', 'buscape', 'zoom'):
+        files = sorted(glob.glob(os.path.join(directory, f'{site}*.html')))
+        if files:
+            pages[site] = [open(f, 'rb').read() for f in files]
+    return pages
+
+
+def timed(func, *args):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = load_pages(sys.argv[1])
+    else:
+        pages = {site: [synthetic_page(site)] for site in ('mercadolivre', 'buscape', 'zoom')}
+
+    comparator = PriceComparator(use_cache=False, use_archive=False)
+    extractors = {
+        'mercadolivre': (legacy_mercadolivre, comparator.parse_mercadolivre),
+        'buscape': (legacy_buscape, comparator.parse_buscape),
+        'zoom': (legacy_zoom, comparator.parse_zoom),
+    }
+
+    print(f"Parser rápido: {PARSER} | mediana de {REPEAT} execuções")
+    print(f"{'site':<14}{'KB':>8}{'antes (ms)':>14}{'depois (ms)':>14}{'ganho':>8}")
+    for site, contents in pages.items():
+        legacy, current = extractors[site]
+        for content in contents:
+            before, _ = timed(legacy, comparator, content, 'https://exemplo')
+            # O código antigo parava no primeiro produto: compara com o primeiro item do gerador
+            after, _ = timed(lambda *args: next(current(*args), None), content, 'https://exemplo')
+            print(f"{site:<14}{len(content) / 1024:>8.0f}{before * 1000:>14.1f}"
+                  f"{after * 1000:>14.1f}{before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
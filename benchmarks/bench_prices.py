@@ -0,0 +1,81 @@
+"""Vazão da conversão de preços: clean_price original x parse_price x parse_prices.
+
+Uso:
+    python benchmarks/bench_prices.py            # 1 milhão de textos
+    python benchmarks/bench_prices.py 200000
+"""
+import os
+import random
+import re
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comparador.prices import parse_price, parse_prices  # noqa: E402
+
+
+def legacy_clean_price(price_text):
+    """Cópia do clean_price original (regex sem pré-compilar + re.sub a cada chamada)"""
+    if not price_text:
+        return None
+    price_text = re.sub(r'\s+', ' ', price_text.strip())
+    price_patterns = [
+        r'R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)',
+        r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)',
+        r'(\d+(?:,\d{2})?)',
+    ]
+    for pattern in price_patterns:
+        match = re.search(pattern, price_text)
+        if match:
+            price_str = match.group(1).replace('.', '').replace(',', '.')
+            try:
+                return float(price_str)
+            except ValueError:
+                continue
+    return None
+
+
+def sample_texts(count, seed=42):
+    """Mistura de formatos vistos nas lojas"""
+    rng = random.Random(seed)
+    formats = [
+        lambda v: f"R$ {v:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
+        lambda v: f"R$\n  {int(v):,}".replace(',', '.'),
+        lambda v: f"{int(v):,}".replace(',', '.'),
+        lambda v: f"10x de R$ {v / 10:.2f}".replace('.', ','),
+        lambda v: f"por apenas {v:.2f} à vista".replace('.', ','),
+        lambda v: "",
+        lambda v: "Indisponível",
+    ]
+    return [rng.choice(formats)(rng.uniform(5, 9000)) for _ in range(count)]
+
+
+def timed(label, func, count):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28}{elapsed:8.2f} s  {count / elapsed / 1e6:8.2f} M textos/s")
+    return np.array([np.nan if v is None else v for v in result], dtype='float64') \
+        if isinstance(result, list) else result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    texts = sample_texts(count)
+    print(f"{count} textos de preço:")
+
+    legacy = timed("clean_price original", lambda: [legacy_clean_price(t) for t in texts], count)
+    scalar = timed("parse_price (pré-compilado)", lambda: [parse_price(t) for t in texts], count)
+    vector = timed("parse_prices (vetorizado)", lambda: parse_prices(texts), count)
+
+    same = np.array_equal(legacy, scalar, equal_nan=True) and np.array_equal(legacy, vector, equal_nan=True)
+    print(f"Resultados idênticos: {'sim' if same else 'NÃO'}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Memória e conversão dos resultados: lista de dicts x Offer (__slots__) x ResultBatch (colunas).
+
+Uso:
+    python benchmarks/bench_records.py            # 1 milhão de produtos
+    python benchmarks/bench_records.py 200000
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comparador.records import Offer, ResultBatch  # noqa: E402
+
+SITES = ['Mercado Livre', 'Amazon', 'Magazine Luiza', 'Casas Bahia', 'Buscapé', 'Zoom', 'Google Shopping']
+
+
+def products(count, seed=42):
+    """Produtos como os extratores devolvem: nome da loja compartilhado, título e link novos"""
+    rng = random.Random(seed)
+    for i in range(count):
+        site = SITES[i % len(SITES)]
+        yield {
+            'site': site,
+            'produto': f"Produto {rng.randint(1, 99999)} - Modelo {i}",
+            'preco': round(rng.uniform(10, 5000), 2),
+            'link': f"https://loja.example.com/p/{i}",
+        }
+
+
+def measure(build):
+    """(objeto, MB alocados) para montar a estrutura (o tracemalloc deixa o tempo sem sentido)"""
+    tracemalloc.start()
+    value = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size / 1e6
+
+
+def timed(func):
+    start = time.perf_counter()
+    value = func()
+    return value, (time.perf_counter() - start) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{count} produtos de {len(SITES)} lojas")
+
+    dicts, dict_mb = measure(lambda: list(products(count)))
+    print(f"  lista de dicts   {dict_mb:8.1f} MB")
+    offers, offer_mb = measure(lambda: [Offer.from_dict(p) for p in products(count)])
+    print(f"  lista de Offer   {offer_mb:8.1f} MB → {offer_mb / dict_mb * 100:.0f}% dos dicts")
+    del offers
+    batch, batch_mb = measure(lambda: ResultBatch.from_products(products(count)))
+    print(f"  ResultBatch      {batch_mb:8.1f} MB → {batch_mb / dict_mb * 100:.0f}% dos dicts")
+    # Sem os textos, que custam o mesmo nas três: só o que cada formato acrescenta
+    texts_mb = (sum(map(sys.getsizeof, batch.produtos)) + sum(map(sys.getsizeof, batch.links))) / 1e6
+    print(f"  sem os textos ({texts_mb:.1f} MB): dicts {dict_mb - texts_mb:.1f} MB | "
+          f"Offer {offer_mb - texts_mb:.1f} MB | ResultBatch {batch_mb - texts_mb:.1f} MB")
+
+    print("Conversão:")
+    df_dicts, ms = timed(lambda: pd.DataFrame(dicts, columns=['site', 'produto', 'preco', 'link']))
+    print(f"  pd.DataFrame(dicts)       {ms:8.1f} ms  {df_dicts.memory_usage(deep=True).sum() / 1e6:7.1f} MB")
+    df_batch, ms = timed(batch.to_frame)
+    shared = np.shares_memory(df_batch['preco'].to_numpy(), np.frombuffer(batch.precos))
+    print(f"  ResultBatch.to_frame()    {ms:8.1f} ms  {df_batch.memory_usage(deep=True).sum() / 1e6:7.1f} MB"
+          f"  (preço sem cópia: {'sim' if shared else 'não'})")
+    del df_dicts, df_batch
+    _, ms = timed(lambda: pa.Table.from_pylist(dicts))
+    print(f"  pa.Table.from_pylist      {ms:8.1f} ms")
+    table, ms = timed(batch.to_arrow)
+    print(f"  ResultBatch.to_arrow()    {ms:8.1f} ms  {table.nbytes / 1e6:7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
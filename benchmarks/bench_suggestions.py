@@ -0,0 +1,102 @@
+"""Forma canônica das consultas e latência das sugestões por prefixo.
+
+Mostra como grafias diferentes do mesmo produto viram uma consulta só e mede
+o QueryIndex com os nomes do catálogo sintético: tempo de montagem, tempo de
+cada sugestão (prefixos de 1 a 12 letras, como alguém digitando) e de cada
+busca nova entrando no índice.
+
+Uso:
+    python benchmarks/bench_suggestions.py
+    python benchmarks/bench_suggestions.py 500000 --seed 7
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comparador.queries import QueryIndex, catalog_names, normalize_query  # noqa: E402
+from comparador.synthetic import SyntheticCatalog  # noqa: E402
+from run_benchmarks import percentile  # noqa: E402
+
+SPELLINGS = [
+    ['iPhone 13', 'iphone13', 'IPHONE 13 ', '  iphone   13'],
+    ['Galaxy S23 128GB', 'galaxy s 23 128 gb', 'GALAXY S23 128 GB'],
+    ['Smart TV 55" 4K', 'smart tv 55 4k', 'Smart-TV 55 4 K'],
+    ['Televisão LG', 'televisao lg', 'TELEVISÃO  LG'],
+    ['Galaxy S23+', 'galaxy s23 +', 'GALAXY S 23+'],
+    ['Cabo USB-C 2m', 'cabo usb-c 2 m', 'CABO USB-C 2M'],
+    ['Echo Dot 5ª', 'echo dot 5º', 'ECHO DOT 5'],
+]
+
+
+def latencies_us(func, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def report(label, samples):
+    print(f"  {label:<34} p50 {percentile(samples, 50):>7.1f} µs | p95 {percentile(samples, 95):>7.1f} µs"
+          f" | p99 {percentile(samples, 99):>7.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalização e sugestões por prefixo")
+    parser.add_argument('queries', nargs='?', type=int, default=200_000, help="Consultas no índice")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--lookups', type=int, default=20_000, help="Sugestões medidas")
+    args = parser.parse_args()
+
+    print("Forma canônica:")
+    for spellings in SPELLINGS:
+        canonical = {normalize_query(spelling) for spelling in spellings}
+        status = "ok" if len(canonical) == 1 else "DIFERENTES"
+        print(f"  {' | '.join(repr(s) for s in spellings):<62} -> {', '.join(sorted(canonical))} ({status})")
+
+    catalog = SyntheticCatalog(args.seed)
+    rng = np.random.default_rng(args.seed)
+    names, _ = catalog.queries(args.queries, rng)
+    # Popularidade de Zipf: poucas consultas concentram quase todas as buscas
+    searches = (1000 / np.arange(1, len(names) + 1) ** catalog.popularity).astype(int) + 1
+
+    index = QueryIndex(warm_for=3600)
+    start = time.perf_counter()
+    index.update((name, 0, None) for name in catalog_names())
+    index.update(zip(names, searches.tolist(), [None] * len(names)))
+    elapsed = time.perf_counter() - start
+    print(f"\nÍndice: {len(index)} consultas, {len(index._entries)} chaves, montado em {elapsed:.2f}s")
+
+    # Prefixos de quem está digitando um nome do catálogo, letra por letra
+    picker = random.Random(args.seed)
+    prefixes = []
+    while len(prefixes) < args.lookups:
+        name = picker.choice(names)
+        prefixes.extend(name[:size] for size in range(1, min(len(name), 12) + 1))
+    prefixes = prefixes[:args.lookups]
+
+    print(f"Sugestões ({len(prefixes)} prefixos de 1 a 12 letras):")
+    report("primeira vez (índice recém-montado)", latencies_us(index.suggest, [(p,) for p in prefixes]))
+    report("repetidas", latencies_us(index.suggest, [(p,) for p in prefixes]))
+    report("só prefixos de 1 a 2 letras", latencies_us(index.suggest, [(p,) for p in prefixes if len(p) <= 2]))
+    report("normalização", latencies_us(normalize_query, [(p,) for p in prefixes]))
+
+    # Buscas novas (e repetidas) entram no índice sem perder os prefixos já calculados
+    new_queries = [f"{picker.choice(names)} {i}" for i in range(1000)] + picker.sample(names, 1000)
+    report("busca entrando no índice", latencies_us(index.add, [(q,) for q in new_queries]))
+    report("sugestões depois das buscas", latencies_us(index.suggest, [(p,) for p in prefixes]))
+
+    top = index.suggest('iph')
+    print(f"\nExemplo: 'iph' -> {[suggestion['query'] for suggestion in top]}")
+
+
+if __name__ == '__main__':
+    main()
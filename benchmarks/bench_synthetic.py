@@ -0,0 +1,91 @@
+"""Catálogo sintético em escala: geração, análise e histórico com números reproduzíveis.
+
+Uso:
+    python benchmarks/bench_synthetic.py                 # 2 milhões de linhas, semente 42
+    python benchmarks/bench_synthetic.py 5000000 --seed 7
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comparador import PriceComparator  # noqa: E402
+from comparador.price_history import DAY, PriceHistory  # noqa: E402
+from comparador.synthetic import SyntheticCatalog  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Testes em escala com o catálogo sintético")
+    parser.add_argument('rows', nargs='?', type=int, default=2_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--searches', type=int, default=200, help="Buscas sintéticas analisadas")
+    parser.add_argument('--history-rows', type=int, default=500_000, help="Linhas gravadas no histórico")
+    args = parser.parse_args()
+
+    catalog = SyntheticCatalog(args.seed)
+    start = time.perf_counter()
+    batch = catalog.generate(args.rows)
+    elapsed = time.perf_counter() - start
+    print(f"Geração: {len(batch)} linhas, {len(batch.queries.names)} consultas, "
+          f"{len(batch.sites.names)} lojas em {elapsed:.2f}s ({len(batch) / elapsed:,.0f} linhas/s)")
+
+    prices = np.frombuffer(batch.precos)
+    again = np.frombuffer(catalog.generate(args.rows).precos)
+    other = np.frombuffer(SyntheticCatalog(args.seed + 1).generate(args.rows).precos)
+    print(f"Reprodutível: mesma semente {'igual' if np.array_equal(prices, again) else 'DIFERENTE'} | "
+          f"outra semente {'diferente' if not np.array_equal(prices, other) else 'IGUAL'}")
+    print(f"Preços: p10 R$ {np.percentile(prices, 10):.2f} | mediana R$ {np.median(prices):.2f} | "
+          f"p90 R$ {np.percentile(prices, 90):.2f} | soma {prices.sum():,.2f}")
+
+    start = time.perf_counter()
+    df = batch.to_frame(with_query=True)
+    summary = df.groupby('query', observed=True)['preco'].agg(['min', 'median', 'size'])
+    elapsed = time.perf_counter() - start
+    top = summary['size'].sort_values(ascending=False)
+    print(f"DataFrame + resumo por consulta: {elapsed * 1000:.0f} ms | "
+          f"as 10 consultas mais buscadas têm {top.head(10).sum() / len(df) * 100:.1f}% das linhas")
+    del df, summary
+
+    # Lojas sintéticas no lugar das de verdade: comparação completa + análise
+    comparator = PriceComparator(synthetic_seed=args.seed, max_results=50)
+    samples = []
+    for query in batch.queries.names[:args.searches]:
+        start = time.perf_counter()
+        comparator.analyze_deals(comparator.find_cheapest(query), product=query)
+        samples.append(time.perf_counter() - start)
+    print(f"Comparação + análise ({len(samples)} buscas em {len(comparator.get_search_functions())} lojas): "
+          f"mediana {statistics.median(samples) * 1000:.1f} ms | pior {max(samples) * 1000:.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = PriceHistory(os.path.join(tmp, 'historico.sqlite3'))
+        rows = min(args.history_rows, len(batch))
+        now = time.time()
+        # Cada consulta gravada em dias diferentes dos últimos 90
+        rng = np.random.default_rng(args.seed)
+        order = np.argsort(np.frombuffer(batch.query_codes, dtype=np.int32)[:rows], kind='stable')
+        codes = np.frombuffer(batch.query_codes, dtype=np.int32)[order]
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        start = time.perf_counter()
+        for chunk in np.split(order, bounds):
+            offers = [batch[i] for i in chunk.tolist()]
+            history.append(batch.query_of(int(chunk[0])), offers, recorded_at=now - rng.uniform(0, 90) * DAY)
+        elapsed = time.perf_counter() - start
+        print(f"Histórico: {rows} linhas em {elapsed:.1f}s ({rows / elapsed:,.0f} linhas/s)")
+
+        samples = []
+        for query in batch.queries.names[:200]:
+            start = time.perf_counter()
+            history.stats(query, 30, now=now)
+            samples.append(time.perf_counter() - start)
+        print(f"Estatísticas de 30 dias: mediana {statistics.median(samples) * 1000:.2f} ms | "
+              f"pior {max(samples) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Teste de carga da API (api.py) contra as lojas simuladas do stub_server.py.
+
+Muitos clientes simultâneos pedem poucas consultas diferentes: mostra a vazão,
+a latência de cauda, quantas buscas de verdade rodaram (o resto foi juntado
+pelo single-flight) e quantos pedidos levaram 503 por falta de vaga.
+
+Uso:
+    python benchmarks/load_test_api.py
+    python benchmarks/load_test_api.py --clients 200 --requests 10 --queries 50 --workers 4 --queue 8
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import quote_plus, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api import ComparisonService, make_server  # noqa: E402
+from comparador import PriceComparator  # noqa: E402
+from comparador.rate_limit import get_scheduler  # noqa: E402
+from run_benchmarks import percentile  # noqa: E402
+from stub_server import start_stub_server, stub_search_urls  # noqa: E402
+
+
+def client(port, queries, count, seed, latencies, statuses, lock):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    for _ in range(count):
+        query = rng.choice(queries)
+        start = time.perf_counter()
+        try:
+            conn.request('GET', f"/compare?q={quote_plus(query)}&k=5")
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            status = 'erro'
+        elapsed = time.perf_counter() - start
+        with lock:
+            statuses[status] += 1
+            if status == 200:
+                latencies.append(elapsed)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API do comparador")
+    parser.add_argument('--clients', type=int, default=100, help="Clientes simultâneos")
+    parser.add_argument('--requests', type=int, default=10, help="Pedidos por cliente")
+    parser.add_argument('--queries', type=int, default=20, help="Consultas diferentes")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--queue', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=150, help="Latência das lojas simuladas em ms")
+    args = parser.parse_args()
+
+    stub, base_url = start_stub_server(latency_ms=args.latency, jitter_ms=args.latency / 3, seed=42)
+    get_scheduler().configure(urlsplit(base_url).netloc, rate=100_000, burst=100_000)
+    urls = stub_search_urls(base_url)
+
+    def comparator_factory(max_results):
+        return PriceComparator(use_cache=False, use_history=False, use_archive=False,
+                               search_urls=urls, max_results=max_results)
+
+    service = ComparisonService(workers=args.workers, queue=args.queue, comparator_factory=comparator_factory)
+    server = make_server(port=0, service=service)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    queries = [f"produto {i}" for i in range(args.queries)]
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    threads = [
+        threading.Thread(target=client, args=(port, queries, args.requests, seed, latencies, statuses, lock))
+        for seed in range(args.clients)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    health = service.health()
+    server.shutdown()
+    service.close()
+    stub.shutdown()
+
+    total = sum(statuses.values())
+    print(f"{args.clients} clientes x {args.requests} pedidos, {args.queries} consultas diferentes, "
+          f"{args.workers} workers + fila {args.queue}, lojas com {args.latency:.0f} ms")
+    print(f"Pedidos: {total} em {elapsed:.1f}s → {total / elapsed:.1f} pedidos/s "
+          f"({statuses[200] / elapsed:.1f} respondidos com 200/s)")
+    print(f"Status: {json.dumps(dict(sorted(statuses.items(), key=str)))}")
+    if latencies:
+        print(f"Latência (200): p50 {percentile(latencies, 50) * 1000:.0f} ms | "
+              f"p95 {percentile(latencies, 95) * 1000:.0f} ms | p99 {percentile(latencies, 99) * 1000:.0f} ms")
+    print(f"Buscas de verdade: {health['started']} | juntadas: {health['coalesced']} | "
+          f"recusadas (503): {health['rejected']}")
+
+
+if __name__ == '__main__':
+    main()
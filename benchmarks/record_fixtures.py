@@ -0,0 +1,40 @@
+"""Grava páginas reais das lojas em benchmarks/fixtures (precisa de internet).
+
+Uso:
+    python benchmarks/record_fixtures.py "iphone 13"
+
+Depois de gravar, confira se os extratores ainda acham produto:
+    python benchmarks/run_benchmarks.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comparador import PriceComparator  # noqa: E402
+from stub_server import FIXTURES_DIR  # noqa: E402
+
+FILENAMES = {
+    'Mercado Livre': 'mercadolivre.html',
+    'Buscapé': 'buscape.html',
+    'Zoom': 'zoom.html',
+}
+
+
+def main():
+    query = sys.argv[1] if len(sys.argv) > 1 else 'iphone 13'
+    # Página inteira: sem limite de bytes
+    comparator = PriceComparator(use_cache=False, use_archive=False, max_page_bytes=None)
+
+    for site_name, filename in FILENAMES.items():
+        status_code, content = comparator.fetch_page(site_name, comparator.get_search_url(site_name, query))
+        if status_code != 200 or not content:
+            print(f"{site_name}: status {status_code}, página não gravada")
+            continue
+        with open(os.path.join(FIXTURES_DIR, filename), 'wb') as f:
+            f.write(content)
+        print(f"{site_name}: {len(content) / 1024:.0f} KB gravados em {filename}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Suíte de benchmarks offline: parsing por extrator, latência de ponta a ponta e alocações.
+
+Tudo roda sem internet: o parsing usa as páginas de benchmarks/fixtures e a
+comparação completa usa o servidor local de stub_server.py. Antes de medir,
+confere título e preço dos primeiros cards de cada página gravada: extrator
+que pula, troca ou desalinha produtos faz o comando terminar com erro.
+
+Uso:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --latency 150 --jitter 80 --error-rate 0.05 --page-kb 800
+    python benchmarks/run_benchmarks.py --save base.json
+    python benchmarks/run_benchmarks.py --baseline base.json --tolerance 0.25   # sai com erro se piorar
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comparador import PriceComparator  # noqa: E402
+from comparador.rate_limit import get_scheduler  # noqa: E402
+from stub_server import FIXTURES_DIR, start_stub_server, stub_search_urls  # noqa: E402
+
+EXTRACTORS = {
+    'mercadolivre': 'parse_mercadolivre',
+    'buscape': 'parse_buscape',
+    'zoom': 'parse_zoom',
+}
+
+
+# (título, preço) esperados dos primeiros cards de cada página gravada
+EXPECTED_FIRST = {
+    'mercadolivre': [
+        ('Apple iPhone 13 (128 GB) - Meia-noite', 3499.0),
+        ('Apple iPhone 13 (256 GB) - Estelar', 4299.0),
+        ('Capa Silicone iPhone 13 Transparente', 39.0),
+    ],
+    'buscape': [
+        ('Apple iPhone 13 (128 GB) - Meia-noite', 3499.0),
+        ('Apple iPhone 13 (256 GB) - Estelar', 4299.0),
+        ('Capa Silicone iPhone 13 Transparente', 39.0),
+    ],
+    'zoom': [
+        ('Apple iPhone 13 (128 GB) - Meia-noite', 3499.9),
+        ('Apple iPhone 13 (256 GB) - Estelar', 4299.9),
+        ('Capa Silicone iPhone 13 Transparente', 39.9),
+        ('Película Vidro 3D iPhone 13', 19.9),
+    ],
+}
+
+
+def percentile(values, p):
+    """Percentil pelo método do posto mais próximo"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def bench_parsing(comparator, repeat):
+    report = {}
+    for site, method in EXTRACTORS.items():
+        with open(os.path.join(FIXTURES_DIR, f'{site}.html'), 'rb') as f:
+            content = f.read()
+        parse = getattr(comparator, method)
+        found = [(p['produto'], p['preco']) for p in parse(content, 'https://exemplo')]
+        expected = EXPECTED_FIRST[site]
+        if found[:len(expected)] != expected:
+            sys.exit(f"ERRO: o extrator de {site} mudou nos primeiros cards da página gravada:\n"
+                     f"  esperado {expected}\n  obtido   {found[:len(expected)]}")
+
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(parse(content, 'https://exemplo'))
+            samples.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        list(parse(content, 'https://exemplo'))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        report[site] = {
+            'parse_ms_median': statistics.median(samples) * 1000,
+            'parse_peak_kb': peak / 1024,
+        }
+    return report
+
+
+def bench_compare(comparator, iterations, query):
+    latencies = []
+    found = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        found.append(sum(len(products) for _, products in comparator.iter_search_results(query) if products))
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    list(comparator.iter_search_results(query))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'avg_results': sum(found) / len(found),
+        'peak_kb': peak / 1024,
+    }
+
+
+def check_regressions(current, baseline, tolerance):
+    """Compara só as métricas de tempo e memória; retorna a lista de pioras"""
+    regressions = []
+    for section, metrics in baseline.items():
+        for name, old in _flatten(metrics):
+            new = _lookup(current.get(section, {}), name)
+            if new is None or not name.endswith(('_ms', '_ms_median', '_kb')) or old <= 0:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(f"{section}.{name}: {old:.2f} -> {new:.2f}")
+    return regressions
+
+
+def _flatten(metrics, prefix=''):
+    for key, value in metrics.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f'{prefix}{key}.')
+        else:
+            yield f'{prefix}{key}', value
+
+
+def _lookup(metrics, dotted):
+    for part in dotted.split('.'):
+        if not isinstance(metrics, dict):
+            return None
+        metrics = metrics.get(part)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks offline do comparador")
+    parser.add_argument('--repeat', type=int, default=20, help="Repetições do parsing")
+    parser.add_argument('--iterations', type=int, default=50, help="Comparações completas")
+    parser.add_argument('--latency', type=float, default=50, help="Latência do servidor em ms")
+    parser.add_argument('--jitter', type=float, default=25, help="Variação da latência em ms")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--page-kb', type=int, help="Tamanho mínimo das páginas servidas")
+    parser.add_argument('--save', help="Grava os resultados em JSON")
+    parser.add_argument('--baseline', help="JSON de referência para detectar regressões")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Piora aceitável (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency_ms=args.latency, jitter_ms=args.jitter,
+                                         error_rate=args.error_rate, page_kb=args.page_kb, seed=42)
+    # O servidor local não precisa de proteção contra excesso de requisições
+    get_scheduler().configure(urlsplit(base_url).netloc, rate=100_000, burst=100_000)
+    # Sem o arquivo de páginas: toda busca mede download e extração, nunca um 304
+    comparator = PriceComparator(use_cache=False, use_history=False, use_archive=False,
+                                 search_urls=stub_search_urls(base_url))
+
+    report = {
+        'parsing': bench_parsing(comparator, args.repeat),
+        'compare': bench_compare(comparator, args.iterations, 'iphone 13'),
+    }
+    server.shutdown()
+
+    print("Parsing por extrator (páginas gravadas):")
+    for site, metrics in report['parsing'].items():
+        print(f"  {site:<14} {metrics['parse_ms_median']:8.2f} ms   pico {metrics['parse_peak_kb']:8.0f} KB")
+
+    compare = report['compare']
+    print(f"\nComparação completa ({args.iterations}x, latência {args.latency:.0f}±{args.jitter:.0f} ms):")
+    print(f"  p50 {compare['p50_ms']:.1f} ms | p95 {compare['p95_ms']:.1f} ms | p99 {compare['p99_ms']:.1f} ms")
+    print(f"  resultados por busca: {compare['avg_results']:.1f} | pico de memória {compare['peak_kb']:.0f} KB")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = check_regressions(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressões encontradas:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nSem regressões em relação à referência")
+
+
+if __name__ == '__main__':
+    main()
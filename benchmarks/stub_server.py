@@ -0,0 +1,143 @@
+"""Servidor HTTP local que imita as lojas, para medir sem depender da internet.
+
+Serve as páginas gravadas em benchmarks/fixtures com latência, variação,
+taxa de erro e tamanho de página configuráveis. Cada página tem ETag e
+Last-Modified, e pedidos condicionais com a página igual recebem 304.
+
+Uso direto:
+    python benchmarks/stub_server.py --port 8765 --latency 200 --jitter 100 --error-rate 0.05
+
+E no código:
+    comparator = PriceComparator(search_urls=stub_search_urls('http://127.0.0.1:8765'))
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Prefixo da URL -> página gravada
+ROUTES = {
+    '/mercadolivre/': 'mercadolivre.html',
+    '/buscape/': 'buscape.html',
+    '/zoom/': 'zoom.html',
+}
+
+
+def stub_search_urls(base_url):
+    """search_urls do PriceComparator apontando para o servidor local"""
+    return {
+        'Mercado Livre': f'{base_url}/mercadolivre/{{query}}',
+        'Buscapé': f'{base_url}/buscape/search?q={{query}}',
+        'Zoom': f'{base_url}/zoom/search?q={{query}}',
+    }
+
+
+def pad_page(content, page_kb):
+    """Aumenta a página até page_kb com JavaScript inline antes dos resultados"""
+    missing = page_kb * 1024 - len(content)
+    if missing <= 0:
+        return content
+    filler = b'<script>window.__CHUNK__ = "' + b'x' * missing + b'";</script>'
+    return content.replace(b'</head>', filler + b'</head>', 1)
+
+
+class StubConfig:
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, page_kb=None, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.pages = {}
+        for prefix, filename in ROUTES.items():
+            with open(os.path.join(FIXTURES_DIR, filename), 'rb') as f:
+                content = f.read()
+            self.pages[prefix] = pad_page(content, page_kb) if page_kb else content
+        self.etags = {prefix: f'"{hashlib.sha1(page).hexdigest()}"' for prefix, page in self.pages.items()}
+        self.last_modified = formatdate(time.time(), usegmt=True)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clientes que fecham a conexão no meio (download com limite) não são erro
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def make_handler(config):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            delay = config.latency_ms + config.random.uniform(-config.jitter_ms, config.jitter_ms)
+            time.sleep(max(delay, 0) / 1000)
+
+            prefix = next((prefix for prefix in config.pages if self.path.startswith(prefix)), None)
+            page = config.pages.get(prefix)
+            if page is None:
+                status, page = 404, b'nao encontrado'
+            elif config.random.random() < config.error_rate:
+                status, page = 503, b'indisponivel'
+            elif self.headers.get('If-None-Match') == config.etags[prefix]:
+                status, page = 304, b''
+            else:
+                status = 200
+
+            self.send_response(status)
+            if status in (200, 304):
+                self.send_header('ETag', config.etags[prefix])
+                self.send_header('Last-Modified', config.last_modified)
+            if status != 304:
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            try:
+                self.wfile.write(page)
+            except (BrokenPipeError, ConnectionResetError):
+                # O cliente pode parar de ler cedo (download com limite de bytes)
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(port=0, **config):
+    """Sobe o servidor numa thread e retorna (servidor, url_base)"""
+    server = StubServer(('127.0.0.1', port), make_handler(StubConfig(**config)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita as lojas")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0, help="Latência em ms")
+    parser.add_argument('--jitter', type=float, default=0, help="Variação da latência em ms")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fração de respostas 503")
+    parser.add_argument('--page-kb', type=int, help="Tamanho mínimo de cada página em KB")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.port, latency_ms=args.latency, jitter_ms=args.jitter,
+                                         error_rate=args.error_rate, page_kb=args.page_kb)
+    print(f"Servidor em {base_url} (Ctrl+C para parar)")
+    for site, url in stub_search_urls(base_url).items():
+        print(f"  {site}: {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
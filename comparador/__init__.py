@@ -0,0 +1,18 @@
+"""Núcleo do comparador de preços, sem interface.
+
+    from comparador import PriceComparator
+    PriceComparator().find_cheapest("notebook dell")
+
+Importar o pacote é barato: PriceComparator só é carregado no primeiro uso, e
+requests, bs4 e NumPy só quando uma busca ou análise precisa deles. O
+Streamlit fica só no app.py.
+"""
+
+__all__ = ['PriceComparator']
+
+
+def __getattr__(name):
+    if name == 'PriceComparator':
+        from .comparator import PriceComparator
+        return PriceComparator
+    raise AttributeError(f"module 'comparador' has no attribute {name!r}")
@@ -0,0 +1,112 @@
+"""Disjuntor (circuit breaker) por loja.
+
+Depois de várias falhas seguidas (erro, timeout ou página sem produto), a loja
+fica "aberta": as buscas nela são puladas na hora, sem esperar o timeout.
+Passado o tempo de espera, uma única busca de teste é liberada ("meio
+aberta"); se der certo a loja volta ao normal, se falhar a espera dobra. Um
+teste que acaba sem veredito (ex: sem vaga no rate limit) só libera a vez.
+"""
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=3, cooldown=30.0, max_cooldown=600.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.last_failure = None
+        self.skipped = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Diz se a busca pode rodar agora"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+
+            # Meio aberto: só uma busca de teste por vez
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+
+            self.skipped += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self._probing = False
+
+    def record_failure(self, reason):
+        with self._lock:
+            self.failures += 1
+            self.last_failure = reason
+
+            if self.state == HALF_OPEN:
+                # O teste falhou: volta a abrir, esperando o dobro
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def release_probe(self):
+        """A busca terminou sem dizer se a loja está boa: libera o teste sem mudar o estado"""
+        with self._lock:
+            self._probing = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._probing = False
+
+    def snapshot(self):
+        """Estado atual para mostrar na interface"""
+        with self._lock:
+            retry_in = 0.0
+            if self.state == OPEN:
+                retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'last_failure': self.last_failure,
+                'retry_in': round(retry_in),
+                'skipped': self.skipped,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """Disjuntor da loja, compartilhado pelo processo"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_states():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
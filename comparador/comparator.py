@@ -0,0 +1,502 @@
+"""PriceComparator: busca nas lojas, ranking dos mais baratos e análise, sem interface.
+
+Não depende do Streamlit. requests, bs4 e NumPy só são importados quando uma
+busca ou análise precisa deles.
+"""
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import quote_plus
+
+from . import metrics
+from .circuit_breaker import get_breaker
+from .extraction import extract_products, get_plan, make_watcher
+from .matching import comparison_group, query_filter
+from .page_archive import get_page_archive
+from .price_history import get_price_history
+from .prices import parse_price
+from .queries import record_search
+from .rate_limit import RateLimited
+from .ranking import TopK, cheapest
+from .result_cache import get_result_cache, FRESH, STALE
+from .synthetic import SyntheticCatalog
+
+
+class PriceComparator:
+    # Prazo padrão (segundos) de cada site e da busca completa
+    DEFAULT_SITE_TIMEOUT = 15
+    DEFAULT_GLOBAL_TIMEOUT = 20
+    # Máximo de bytes baixados por página
+    DEFAULT_MAX_PAGE_BYTES = 2 * 1024 * 1024
+    # Quantos produtos mais baratos (somando todos os sites) a comparação mostra
+    DEFAULT_MAX_RESULTS = 10
+    # Cards lidos por página de busca (o download para quando eles chegam)
+    MAX_CARDS_PER_PAGE = 50
+    # Lojas com preço simulado: aparecem na comparação, mas nunca vão para o cache nem para o histórico
+    SIMULATED_SITES = frozenset({'Google Shopping'})
+    # Endereços de busca ({query} vira o produto); podem apontar para um servidor local
+    SEARCH_URLS = {
+        'Mercado Livre': 'https://lista.mercadolivre.com.br/{query}',
+        'Buscapé': 'https://www.buscape.com.br/search?q={query}',
+        'Zoom': 'https://www.zoom.com.br/search?q={query}',
+    }
+
+    def __init__(self, site_timeouts=None, global_timeout=None, max_workers=None, use_cache=True,
+                 max_page_bytes=DEFAULT_MAX_PAGE_BYTES, search_urls=None, profile_dir=None,
+                 max_results=DEFAULT_MAX_RESULTS, use_history=True, synthetic_seed=None, use_archive=True,
+                 extraction_pool=None):
+        # Lista de User-Agents para evitar detecção
+        self.user_agents = [
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
+        ]
+        self.results = []
+        # Lojas puladas na última busca porque o disjuntor estava aberto
+        self.skipped_sites = []
+        
+        # Prazos por site (ex: {'Zoom': 8}) e prazo global da comparação
+        self.site_timeouts = site_timeouts or {}
+        self.global_timeout = global_timeout or self.DEFAULT_GLOBAL_TIMEOUT
+        self.max_workers = max_workers
+        
+        # Orçamento de bytes por página (None baixa a página inteira)
+        self.max_page_bytes = max_page_bytes
+        
+        # K: quantos produtos mais baratos entram no resultado final
+        self.max_results = max_results
+        
+        self.search_urls = dict(self.SEARCH_URLS, **(search_urls or {}))
+        
+        # Pasta para um .prof do cProfile por busca de loja (None desliga)
+        self.profile_dir = profile_dir or os.environ.get('COMPARADOR_PROFILE_DIR')
+        
+        # Lojas sintéticas no lugar das de verdade (semente do argumento ou de COMPARADOR_SYNTHETIC_SEED)
+        if synthetic_seed is None and os.environ.get('COMPARADOR_SYNTHETIC_SEED'):
+            synthetic_seed = int(os.environ['COMPARADOR_SYNTHETIC_SEED'])
+        self.synthetic = SyntheticCatalog(synthetic_seed) if synthetic_seed is not None else None
+        # Simulação da demonstração e do Google Shopping: sempre os mesmos números por consulta
+        self.mock_catalog = self.synthetic or SyntheticCatalog()
+        
+        # Cache compartilhado de resultados (use_cache=False desliga)
+        # Dados sintéticos nunca vão para o cache nem para o histórico das buscas de verdade
+        self.cache = get_result_cache() if use_cache and not self.synthetic else None
+        
+        # Histórico de preços das buscas novas (use_history=False desliga)
+        self.history = get_price_history() if use_history and not self.synthetic else None
+        
+        # Arquivo das páginas baixadas, para pedidos condicionais e replay (use_archive=False desliga)
+        self.archive = get_page_archive() if use_archive and not self.synthetic else None
+        
+        # ExtractionPool para extrair as páginas em outros processos (None extrai na própria thread)
+        self.extraction_pool = extraction_pool
+    
+    def get_timeout(self, site_name):
+        """Retorna o prazo (segundos) de um site"""
+        return self.site_timeouts.get(site_name, self.DEFAULT_SITE_TIMEOUT)
+    
+    def get_headers(self):
+        """Retorna headers aleatórios para evitar detecção"""
+        return {
+            'User-Agent': random.choice(self.user_agents),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        }
+    
+    def get_search_url(self, site_name, product):
+        """Monta a URL de busca do site para o produto"""
+        return self.search_urls[site_name].format(query=quote_plus(product))
+    
+    def fetch_page(self, site_name, search_url, watcher=None, extra_headers=None, response_headers=None):
+        """Baixa a página em streaming, parando quando o watcher já viu produtos suficientes"""
+        # requests só é importado na primeira busca de verdade
+        from .http_pool import get_session_pool
+        
+        headers = self.get_headers()
+        headers.update(extra_headers or {})
+        # Sessão compartilhada: reaproveita conexões entre buscas e reruns
+        return get_session_pool().fetch_capped(
+            search_url,
+            max_bytes=self.max_page_bytes,
+            stop=watcher.feed_chunk if watcher else None,
+            headers=headers,
+            timeout=self.get_timeout(site_name),
+            response_headers=response_headers,
+        )
+    
+    def fetch_products(self, site_name, search_url, watcher):
+        """Baixa a página, extrai os produtos e arquiva os dois
+        
+        Se a página já está no arquivo, o pedido vai condicional: num 304 os
+        produtos guardados são devolvidos sem baixar nem extrair de novo.
+        """
+        archived_sha, conditional = self.archive.conditional_headers(search_url) if self.archive else (None, {})
+        response_headers = {}
+        status_code, content = self.fetch_page(site_name, search_url, watcher,
+                                               extra_headers=conditional, response_headers=response_headers)
+        
+        if status_code == 304 and archived_sha:
+            metrics.set_outcome('not_modified')
+            self.archive.revalidated(site_name, search_url, archived_sha, response_headers)
+            products = self.archive.products(search_url, archived_sha)
+            if products is not None:
+                return products
+            # Página arquivada sem extração guardada: extrai dela, sem rede
+            sha256, content = archived_sha, self.archive.page(archived_sha)
+        elif status_code == 200:
+            sha256 = self.archive.store(site_name, search_url, content, response_headers) if self.archive else None
+        else:
+            return []
+        
+        with metrics.stage('extract'):
+            products = self.extract(site_name, content, search_url)
+        if sha256:
+            self.archive.save_products(search_url, sha256, products)
+        return products
+    
+    def extract(self, site_name, content, search_url):
+        """Lista dos produtos da página, no pool de processos se houver um"""
+        if self.extraction_pool:
+            return self.extraction_pool.extract(site_name, content, search_url)
+        return extract_products(site_name, content, search_url)
+    
+    def get_parser(self, site_name):
+        """Extrator da página de busca de uma loja: (conteúdo, url) -> produtos"""
+        return get_plan(site_name).extract
+    
+    def clean_price(self, price_text):
+        """Extrai o valor numérico do preço"""
+        # Padrões brasileiros pré-compilados (R$ 1.234,56 / 1.234,56 / 1234,56)
+        return parse_price(price_text)
+    
+    def search_site(self, site_name, product):
+        """Busca numa loja do registro de extração e devolve os produtos da página, um a um
+        
+        Erros (inclusive RateLimited) sobem para o run_search, que os separa de página vazia.
+        """
+        search_url = self.get_search_url(site_name, product)
+        
+        # Para de baixar assim que os cards lidos já chegaram
+        yield from self.fetch_products(site_name, search_url,
+                                       make_watcher(site_name, self.MAX_CARDS_PER_PAGE))
+    
+    def search_mercadolivre(self, product):
+        """Busca no Mercado Livre"""
+        return self.search_site('Mercado Livre', product)
+    
+    def parse_mercadolivre(self, content, search_url):
+        """Gera cada produto válido da página de busca do Mercado Livre"""
+        return get_plan('Mercado Livre').extract(content, search_url)
+    
+    def search_buscape(self, product):
+        """Busca no Buscapé - mais acessível para scraping"""
+        return self.search_site('Buscapé', product)
+    
+    def parse_buscape(self, content, search_url):
+        """Gera cada produto válido da página de busca do Buscapé"""
+        return get_plan('Buscapé').extract(content, search_url)
+    
+    def search_google_shopping(self, product):
+        """Simula busca no Google Shopping"""
+        try:
+            # Simulação com o catálogo sintético: o link leva à busca do Google Shopping
+            yield from self.mock_catalog.offers(product, 'Google Shopping', 1, accessories=False)
+            
+        except Exception as e:
+            print(f"Erro Google Shopping: {e}")
+    
+    def search_zoom(self, product):
+        """Busca no Zoom (Buscapé)"""
+        return self.search_site('Zoom', product)
+    
+    def parse_zoom(self, content, search_url):
+        """Gera os pares (título, preço) da página do Zoom, na ordem em que aparecem"""
+        return get_plan('Zoom').extract(content, search_url)
+    
+    def generate_mock_data(self, product):
+        """Gera dados simulados para demonstração (os mesmos para a mesma consulta)"""
+        mock_results = []
+        for site_name in ('Mercado Livre', 'Amazon', 'Magazine Luiza', 'Casas Bahia'):
+            # Algumas ofertas por loja, como numa página de busca
+            mock_results.extend(self.mock_catalog.offers(product, site_name, 3, accessories=False))
+        
+        return cheapest(mock_results, self.max_results)
+    
+    def get_search_functions(self):
+        """Lista de sites pesquisados e suas funções de busca"""
+        if self.synthetic:
+            return [(site_name, self.synthetic.searcher(site_name, self.MAX_CARDS_PER_PAGE))
+                    for site_name in self.synthetic.site_names]
+        return [
+            ('Mercado Livre', self.search_mercadolivre),
+            ('Buscapé', self.search_buscape),
+            ('Google Shopping', self.search_google_shopping),
+            ('Zoom', self.search_zoom),
+        ]
+    
+    def collect_products(self, search_func, product):
+        """Consome o gerador da loja e devolve os produtos do mais barato para o mais caro"""
+        # O limite é por página, não K: o mesmo resultado (e o cache) serve para qualquer K
+        return cheapest(search_func(product), self.MAX_CARDS_PER_PAGE)
+    
+    def run_search(self, site_name, search_func, product):
+        """Roda a busca de um site passando pelo disjuntor da loja, com medição de tempo"""
+        with metrics.trace(site_name, product) as trace:
+            breaker = get_breaker(site_name)
+            if not breaker.allow():
+                # Loja falhando seguidamente: pula na hora em vez de esperar o timeout
+                self.skipped_sites.append(site_name)
+                trace.outcome = 'skipped'
+                return None
+            
+            try:
+                if self.profile_dir:
+                    products = metrics.profile_call(self.profile_dir, f"{product}-{site_name}",
+                                                    self.collect_products, search_func, product)
+                else:
+                    products = self.collect_products(search_func, product)
+            except RateLimited as e:
+                # Quem não deu vaga no prazo foi o nosso limite de ritmo, não a loja: o disjuntor não conta
+                print(f"Sem vaga no {site_name}: {e}")
+                trace.outcome = 'rate_limited'
+                # Se era a busca de teste da loja meio aberta, a próxima busca testa de novo
+                breaker.release_probe()
+                return None
+            except Exception as e:
+                breaker.record_failure(f"erro: {e}")
+                raise
+            
+            if products:
+                breaker.record_success()
+                trace.results = len(products)
+            else:
+                # Página sem produto (ou resposta diferente de 200, como um bloqueio anti-robô)
+                breaker.record_failure("sem resultado")
+                trace.outcome = 'empty'
+            return products
+    
+    def search_and_cache(self, site_name, search_func, product):
+        """Roda a busca de um site e guarda os produtos no cache e no histórico"""
+        products = self.run_search(site_name, search_func, product)
+        if not products or site_name in self.SIMULATED_SITES:
+            return products
+        if self.cache:
+            self.cache.set(product, site_name, products)
+        if self.history:
+            # O cache guarda a página inteira; o histórico, só o produto buscado (capas e outros
+            # modelos puxariam o mínimo e os percentis para baixo)
+            wanted = list(filter(query_filter(product), products))
+            if wanted:
+                self.history.append(product, wanted)
+        return products
+    
+    def cached_products(self, site_name, search_func, product):
+        """Produtos da loja no cache (velhos são atualizados em segundo plano); None se precisar buscar"""
+        if not self.cache or site_name in self.SIMULATED_SITES:
+            return None
+        cached, state = self.cache.get(product, site_name)
+        if state == STALE:
+            # Responde na hora com o valor velho e atualiza em segundo plano
+            self.cache.refresh_in_background(
+                product, site_name,
+                lambda query: self.run_search(site_name, search_func, query)
+            )
+        if state in (FRESH, STALE):
+            # Entradas gravadas antes das listas guardavam um produto só
+            return [cached] if isinstance(cached, dict) else cached
+        return None
+    
+    def iter_search_results(self, product):
+        """Busca em todos os sites ao mesmo tempo e devolve (site, produtos) conforme terminam"""
+        # As lojas recebem o texto digitado; o cache e o histórico guardam pela forma canônica
+        # (normalize_query), então "IPHONE13" e "iphone 13" caem na mesma entrada
+        product = product.strip()
+        self.skipped_sites = []
+        search_functions = []
+        for site_name, search_func in self.get_search_functions():
+            cached = self.cached_products(site_name, search_func, product)
+            if cached is not None:
+                yield site_name, cached
+            else:
+                search_functions.append((site_name, search_func))
+        
+        if not search_functions:
+            return
+        
+        start = time.monotonic()
+        global_deadline = start + self.global_timeout
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers or len(search_functions))
+        pending = {}
+        for site_name, search_func in search_functions:
+            future = executor.submit(self.search_and_cache, site_name, search_func, product)
+            # Cada site tem seu prazo, mas nenhum passa do prazo global
+            deadline = min(start + self.get_timeout(site_name), global_deadline)
+            pending[future] = (site_name, deadline)
+        
+        try:
+            while pending:
+                now = time.monotonic()
+                
+                # Sites que estouraram o prazo são abandonados (a thread termina sozinha)
+                for future, (site_name, deadline) in list(pending.items()):
+                    if deadline <= now and not future.done():
+                        print(f"Tempo esgotado no {site_name}")
+                        del pending[future]
+                        yield site_name, None
+                
+                if not pending:
+                    break
+                
+                next_deadline = min(deadline for _, deadline in pending.values())
+                done, _ = wait(pending, timeout=max(0, next_deadline - now),
+                               return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    site_name, _ = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Erro ao buscar no {site_name}: {e}")
+                        result = None
+                    yield site_name, result
+        finally:
+            # Não espera buscas travadas: a resposta sai no tempo do site mais lento dentro do prazo
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def find_cheapest(self, product, on_site_done=None):
+        """Núcleo da comparação, sem Streamlit: os K mais baratos de todos os sites (sem dados simulados)
+        
+        on_site_done(site, produtos, ranking) é chamado quando cada site termina.
+        Acessórios e anúncios de outros produtos não entram no ranking.
+        """
+        # Ranking global: só os K melhores ficam na memória, seja qual for o total de produtos
+        top = TopK(self.max_results)
+        is_wanted = query_filter(product)
+        start = time.monotonic()
+        first_result_at = None
+        
+        for site_name, products in self.iter_search_results(product):
+            # None: site que estourou o prazo ou foi pulado
+            wanted = [p for p in products or () if is_wanted(p)]
+            if wanted:
+                top.extend(wanted)
+                if first_result_at is None:
+                    # Quanto o usuário espera até ver o primeiro preço
+                    first_result_at = time.monotonic() - start
+                    metrics.observe('first_result', first_result_at)
+            if on_site_done:
+                on_site_done(site_name, products, top)
+        
+        # Do mais barato para o mais caro
+        results = top.items()
+        if self.cache and results:
+            # A consulta passa a ser sugerida, já com resultado pronto no cache
+            record_search(product)
+        return results
+    
+    def deal_stats(self, results):
+        """Calcula os números da comparação (usado pela análise e pelo modo batch)"""
+        prices = [r['preco'] for r in results]
+        min_price = min(prices)
+        max_price = max(prices)
+        savings = max_price - min_price
+        
+        return {
+            'min_price': min_price,
+            'max_price': max_price,
+            'avg_price': sum(prices) / len(prices),
+            'best_deal': min(results, key=lambda x: x['preco']),
+            'worst_deal': max(results, key=lambda x: x['preco']),
+            'savings': savings,
+            'savings_percent': (savings / max_price) * 100 if max_price > 0 else 0,
+        }
+    
+    def history_stats(self, product, before=None):
+        """Estatísticas de 30 e 90 dias do histórico, só com preços gravados antes de `before`"""
+        if not self.history:
+            return {}
+        
+        stats = {}
+        for days in (30, 90):
+            window = self.history.stats(product, days, now=before)
+            if window:
+                stats[days] = window
+        return stats
+    
+    def analyze_deals(self, results, product=None, before=None):
+        """Analisa se vale a pena comprar (com o histórico, se o produto for informado)"""
+        if len(results) < 2:
+            return "Poucos resultados para análise"
+        
+        # Só compara anúncios do mesmo produto (capas e modelos diferentes ficam de fora)
+        group = comparison_group(results, product)
+        compared = group if len(group) >= 2 else results
+        
+        stats = self.deal_stats(compared)
+        min_price = stats['min_price']
+        max_price = stats['max_price']
+        avg_price = stats['avg_price']
+        best_deal = stats['best_deal']
+        worst_deal = stats['worst_deal']
+        savings = stats['savings']
+        savings_percent = stats['savings_percent']
+        
+        analysis = f"""
+        📊 **Análise de Preços:**
+        
+        • **Menor preço:** R$ {min_price:.2f} - {best_deal['site']}
+        • **Maior preço:** R$ {max_price:.2f} - {worst_deal['site']}
+        • **Preço médio:** R$ {avg_price:.2f}
+        • **Economia máxima:** R$ {savings:.2f} ({savings_percent:.1f}%)
+        """
+        
+        if compared is group and len(group) < len(results):
+            analysis += f"""
+        🔗 **Comparando o mesmo produto:** {len(group)} de {len(results)} anúncios, em {len({r['site'] for r in group})} loja(s) - os demais são outros modelos ou acessórios
+        """
+        elif compared is not group:
+            analysis += """
+        ⚠️ Os anúncios parecem ser de produtos diferentes - compare os modelos antes de decidir
+        """
+        
+        history = self.history_stats(product, before) if product else {}
+        if history:
+            analysis += """
+        📈 **Histórico de preços:**
+        """
+            for days, window in history.items():
+                analysis += f"""
+        • **{days} dias:** mínimo R$ {window['min']:.2f} · mediana R$ {window['median']:.2f} · 25% mais baratos até R$ {window['p25']:.2f} ({window['count']} preços)"""
+            
+            recent = history.get(30) or history.get(90)
+            difference = (min_price - recent['median']) / recent['median'] * 100
+            if min_price <= recent['min']:
+                analysis += f"""
+        • 🟢 **Menor preço dos últimos {recent['days']} dias!**"""
+            elif difference < 0:
+                analysis += f"""
+        • Hoje está {-difference:.1f}% abaixo da mediana de {recent['days']} dias"""
+            else:
+                analysis += f"""
+        • Hoje está {difference:.1f}% acima da mediana de {recent['days']} dias"""
+            analysis += "\n"
+        
+        analysis += """
+        💡 **Recomendação:**
+        """
+        
+        if savings_percent > 20:
+            analysis += f"🟢 **VALE MUITO A PENA!** Você pode economizar {savings_percent:.1f}% comprando no {best_deal['site']}"
+        elif savings_percent > 10:
+            analysis += f"🟡 **Vale a pena** comprar no {best_deal['site']} - economia de {savings_percent:.1f}%"
+        elif savings_percent > 5:
+            analysis += f"🟠 **Pequena diferença** - {best_deal['site']} ainda é a melhor opção"
+        else:
+            analysis += f"🔴 **Preços similares** - qualquer opção é boa. Considere frete e prazo de entrega."
+        
+        return analysis
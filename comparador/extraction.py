@@ -0,0 +1,235 @@
+"""Extração dos produtos das páginas de busca: regras declarativas por loja e pool de processos.
+
+Cada loja é só uma entrada em SITE_RULES: que partes da página viram árvore,
+onde estão os cards e, para cada campo (título, preço, link), as alternativas
+em ordem de preferência. Uma alternativa é um seletor CSS ('h2.titulo') ou um
+dict com um dos tipos abaixo:
+
+    {'string': regex}      primeiro texto solto que casa com a regex
+    {'attrs': {...}}       primeira tag com esses atributos (como no find do bs4)
+    {'parent': 'a'}        primeira tag ancestral com esse nome
+
+'strategies' é a lista de conjuntos de seletores do card: vale o primeiro
+conjunto que achar título e preço válidos. Lojas sem card (Zoom) usam 'pairs':
+cada título vai com o primeiro preço que aparece depois dele e antes do
+próximo título (título sem preço, como o <h1> da página, fica de fora).
+
+As regras são compiladas uma vez por processo em um ExtractionPlan (seletores
+CSS viram objetos do soupsieve). O ExtractionPool roda extract_products em
+outros processos: o bs4 é puro Python e preso ao GIL, então é assim que a
+extração usa mais de um núcleo no batch e no replay.
+"""
+import functools
+import os
+import re
+from collections import deque
+
+from .parsing import (make_soup, CardWatcher, MERCADOLIVRE_FILTER, BUSCAPE_FILTER, BUSCAPE_PRODUCT_TESTID,
+                      ZOOM_FILTER, PRICE_TEXT_REGEX, is_mercadolivre_card, is_buscape_card, is_heading)
+from .prices import parse_price
+
+SITE_RULES = {
+    'Mercado Livre': {
+        # Só os cards de resultado viram árvore
+        'parse_only': MERCADOLIVRE_FILTER,
+        'watch': {'match_tag': is_mercadolivre_card},
+        'cards': [{'name': 'div', 'class_': 'ui-search-result__wrapper'}],
+        'strategies': [
+            # Seletor mais específico
+            {'title': 'h2.ui-search-item__title', 'price': '.andes-money-amount__fraction', 'link': 'a'},
+            # Seletor alternativo
+            {'title': '.ui-search-item__title', 'price': '.price-tag-fraction', 'link': 'a'},
+            # Seletor genérico
+            {'title': 'h2', 'price': '[class*="price"], [class*="money"]', 'link': 'a'},
+        ],
+        'base_url': 'https://mercadolivre.com.br',
+    },
+    'Buscapé': {
+        # Só cards de produto (e links que os envolvem) viram árvore
+        'parse_only': BUSCAPE_FILTER,
+        'watch': {'match_tag': is_buscape_card},
+        # Layout atual; sem ele, qualquer div marcada como produto
+        'cards': [
+            {'name': 'div', 'class_': 'ProductCard_ProductCard_Inner__7JhKb'},
+            {'name': 'div', 'attrs': {'data-testid': BUSCAPE_PRODUCT_TESTID}},
+        ],
+        'strategies': [{
+            'title': ['h2', 'h3', {'attrs': {'data-testid': re.compile('product.*title')}}],
+            'price': [{'string': PRICE_TEXT_REGEX}, {'attrs': {'data-testid': re.compile('.*price.*')}}],
+            # Alguns cards ficam dentro do <a>
+            'link': ['a', {'parent': 'a'}],
+        }],
+        'base_url': 'https://www.buscape.com.br',
+    },
+    'Zoom': {
+        # Só títulos e textos com preço viram árvore
+        'parse_only': ZOOM_FILTER,
+        'watch': {'match_tag': is_heading, 'match_string': PRICE_TEXT_REGEX.search},
+        'pairs': {'title': {'name': ['h1', 'h2', 'h3', 'h4']}, 'price': {'string': PRICE_TEXT_REGEX}},
+    },
+}
+
+
+def compile_selector(spec):
+    """Transforma uma alternativa do registro em função card -> elemento (ou None)"""
+    if isinstance(spec, str):
+        import soupsieve
+
+        return soupsieve.compile(spec).select_one
+    if 'string' in spec:
+        return functools.partial(lambda pattern, card: card.find(string=pattern), spec['string'])
+    if 'attrs' in spec:
+        return functools.partial(lambda attrs, card: card.find(attrs=attrs), spec['attrs'])
+    if 'parent' in spec:
+        return functools.partial(lambda name, card: card.find_parent(name), spec['parent'])
+    raise ValueError(f"Seletor desconhecido: {spec!r}")
+
+
+def element_text(element):
+    """Texto do elemento; texto solto (NavigableString) vai como está"""
+    return element.get_text(strip=True) if hasattr(element, 'get_text') else str(element)
+
+
+class ExtractionPlan:
+    """Regras de uma loja já compiladas, prontas para extrair qualquer página dela"""
+
+    def __init__(self, site, rules):
+        self.site = site
+        self.parse_only = rules.get('parse_only')
+        self.base_url = rules.get('base_url')
+        self.cards = rules.get('cards', [])
+        # Cada campo vira uma lista de alternativas compiladas, na ordem do registro
+        self.strategies = [
+            {field: [compile_selector(spec) for spec in (specs if isinstance(specs, list) else [specs])]
+             for field, specs in strategy.items()}
+            for strategy in rules.get('strategies', [])
+        ]
+        self.pairs = rules.get('pairs')
+
+    def first(self, card, alternatives):
+        for select in alternatives:
+            element = select(card)
+            if element is not None:
+                return element
+        return None
+
+    def product_link(self, link_elem, search_url):
+        """Link do produto; sem href (ou sem base para href relativo) fica a própria busca"""
+        href = link_elem.get('href') if link_elem is not None else None
+        if href:
+            if href.startswith('http'):
+                return href
+            if href.startswith('/') and self.base_url:
+                return f"{self.base_url}{href}"
+        return search_url
+
+    def extract(self, content, search_url):
+        """Gera cada produto válido da página de busca"""
+        soup = make_soup(content, parse_only=self.parse_only)
+        if self.pairs:
+            yield from self.extract_pairs(soup, search_url)
+            return
+
+        cards = []
+        for finder in self.cards:
+            cards = soup.find_all(**finder)
+            if cards:
+                break
+        for card in cards:
+            for strategy in self.strategies:
+                title_elem = self.first(card, strategy['title'])
+                price_elem = self.first(card, strategy['price'])
+                if title_elem is None or price_elem is None:
+                    continue
+                price = parse_price(element_text(price_elem))
+                if price and price > 0:
+                    yield {'site': self.site, 'produto': title_elem.get_text(strip=True), 'preco': price,
+                           'link': self.product_link(self.first(card, strategy.get('link', [])), search_url)}
+                    break
+
+    def extract_pairs(self, soup, search_url):
+        """Título + primeiro preço antes do próximo título, na ordem da página"""
+        title_names = set(self.pairs['title']['name'])
+        pattern = self.pairs['price']['string']
+        title_elem = None
+        for node in soup.descendants:
+            if getattr(node, 'name', None) in title_names:
+                title_elem = node
+            elif (title_elem is not None and isinstance(node, str) and pattern.search(node)
+                  and title_elem not in node.parents):
+                price = parse_price(node)
+                if price and price > 0:
+                    yield {'site': self.site, 'produto': title_elem.get_text(strip=True),
+                           'preco': price, 'link': search_url}
+                # Um preço por título: o próximo preço só vale depois de outro título
+                title_elem = None
+
+
+@functools.lru_cache(maxsize=None)
+def get_plan(site):
+    """Plano compilado da loja (um por processo); KeyError para loja sem regras"""
+    return ExtractionPlan(site, SITE_RULES[site])
+
+
+def make_watcher(site, cards):
+    """CardWatcher que para o download quando `cards` cards da loja já chegaram"""
+    return CardWatcher(cards=cards, **SITE_RULES[site]['watch'])
+
+
+def extract_products(site, content, search_url):
+    """Lista dos produtos da página; é a função que roda nos processos do pool"""
+    return list(get_plan(site).extract(content, search_url))
+
+
+def _warm_up():
+    # Cada processo importa o bs4 e compila os planos uma vez, antes da primeira página
+    for site in SITE_RULES:
+        get_plan(site)
+    make_soup(b'<html></html>')
+
+
+class ExtractionPool:
+    """Processos que extraem páginas em paralelo; só viajam (loja, bytes, URL) e a lista de produtos"""
+
+    def __init__(self, workers=None):
+        # multiprocessing só carrega quando alguém usa o pool
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.workers = workers or os.cpu_count() or 1
+        # forkserver: o processo novo não herda threads nem conexões do pai (fork com threads pode travar)
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_warm_up)
+
+    def submit(self, site, content, search_url):
+        """Future com a lista de produtos da página"""
+        return self._executor.submit(extract_products, site, content, search_url)
+
+    def extract(self, site, content, search_url):
+        return self.submit(site, content, search_url).result()
+
+    def imap(self, jobs, window=None):
+        """Gera (job, produtos) na ordem dos jobs (loja, conteúdo, URL, ...), com no máximo `window` em voo
+
+        Os jobs são lidos aos poucos: o arquivo inteiro não precisa caber na memória.
+        """
+        window = window or self.workers * 4
+        pending = deque()
+        for job in jobs:
+            pending.append((job, self.submit(*job[:3])))
+            if len(pending) >= window:
+                job, future = pending.popleft()
+                yield job, future.result()
+        while pending:
+            job, future = pending.popleft()
+            yield job, future.result()
+
+    def close(self):
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
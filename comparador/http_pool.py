@@ -0,0 +1,239 @@
+"""Pool de conexões HTTP compartilhado por todo o processo.
+
+O Streamlit reexecuta o app.py a cada clique, mas módulos importados ficam
+guardados em sys.modules. Por isso o pool mora aqui: ele sobrevive aos reruns
+e a todas as instâncias de PriceComparator, reaproveitando DNS, TCP e TLS.
+"""
+import codecs
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from . import metrics
+from .rate_limit import get_scheduler, parse_retry_after
+
+# Título de página anti-robô (que às vezes vem com status 200)
+BLOCK_PAGE_REGEX = re.compile(
+    r'<title>[^<]*(captcha|access denied|acesso negado|attention required|just a moment|robot)[^<]*</title>',
+    re.I
+)
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        # DNS + TCP; só acontece em conexão nova, nunca em conexão reaproveitada
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            metrics.record_stage('connect', time.perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        # DNS + TCP + TLS
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            metrics.record_stage('connect', time.perf_counter() - start)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedAdapter(HTTPAdapter):
+    """HTTPAdapter cujas conexões novas registram o tempo de abertura"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+class SessionPool:
+    """Uma requests.Session por host, com limite de conexões e expiração por ociosidade"""
+
+    def __init__(self, pool_size=10, idle_timeout=90, scheduler=None):
+        # pool_size: conexões mantidas abertas por host
+        # idle_timeout: segundos sem uso até a sessão do host ser fechada
+        # scheduler: HostScheduler que dita o ritmo por host (None não limita)
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.scheduler = scheduler
+        self._sessions = {}  # host -> {'session', 'last_used', 'in_use'}
+        self._lock = threading.Lock()
+        self._counters = {
+            'requests': 0,
+            'sessions_created': 0,
+            'sessions_expired': 0,
+            # Contagem das sessões já fechadas, para não perder o histórico
+            'closed_connections': 0,
+            'closed_requests': 0,
+        }
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = TimedAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _connection_counts(self, session):
+        """Soma conexões abertas e requisições feitas nos pools do urllib3"""
+        connections = requests_made = 0
+        # O mesmo adapter atende http:// e https://, então conta uma vez só
+        for adapter in {id(a): a for a in session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    requests_made += pool.num_requests
+        return connections, requests_made
+
+    def _close(self, host):
+        entry = self._sessions.pop(host)
+        connections, requests_made = self._connection_counts(entry['session'])
+        self._counters['closed_connections'] += connections
+        self._counters['closed_requests'] += requests_made
+        entry['session'].close()
+
+    def _expire_idle(self, now):
+        for host, entry in list(self._sessions.items()):
+            if entry['in_use'] == 0 and now - entry['last_used'] > self.idle_timeout:
+                self._close(host)
+                self._counters['sessions_expired'] += 1
+
+    def request(self, method, url, **kwargs):
+        """Faz a requisição usando a sessão (e as conexões) do host"""
+        host = urlsplit(url).netloc
+        if self.scheduler:
+            # Espera a vez do host, no máximo pelo timeout da própria requisição
+            timeout = kwargs.get('timeout')
+            with metrics.stage('queue'):
+                self.scheduler.acquire(host, timeout=timeout[0] if isinstance(timeout, tuple) else timeout)
+
+        with self._lock:
+            self._expire_idle(time.monotonic())
+            entry = self._sessions.get(host)
+            if entry is None:
+                entry = {'session': self._new_session(), 'last_used': 0, 'in_use': 0}
+                self._sessions[host] = entry
+                self._counters['sessions_created'] += 1
+            entry['in_use'] += 1
+            self._counters['requests'] += 1
+
+        try:
+            response = entry['session'].request(method, url, **kwargs)
+            if self.scheduler:
+                self.scheduler.report(host, response.status_code,
+                                      retry_after=parse_retry_after(response.headers.get('Retry-After')))
+            return response
+        finally:
+            with self._lock:
+                entry['in_use'] -= 1
+                entry['last_used'] = time.monotonic()
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def fetch_capped(self, url, max_bytes=None, stop=None, chunk_size=16 * 1024, response_headers=None, **kwargs):
+        """Baixa a página em pedaços e para cedo.
+
+        Para ao passar de max_bytes ou quando stop(texto_do_pedaço) retorna True.
+        Retorna (status_code, bytes recebidos); página anti-robô vira 403.
+        Fechar a resposta no meio descarta o resto sem ler do socket.
+        response_headers (dict), se informado, recebe os cabeçalhos da resposta.
+        """
+        # Com stream=True a chamada volta assim que os cabeçalhos chegam
+        with metrics.stage('ttfb'):
+            response = self.get(url, stream=True, **kwargs)
+        if response_headers is not None:
+            response_headers.update(response.headers)
+        try:
+            if response.status_code != 200:
+                return response.status_code, b''
+
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            chunks = []
+            received = 0
+            with metrics.stage('download'):
+                for chunk in response.iter_content(chunk_size):
+                    text = decoder.decode(chunk)
+                    if not chunks and BLOCK_PAGE_REGEX.search(text):
+                        # Página anti-robô: avisa o agendador para desacelerar este host
+                        if self.scheduler:
+                            self.scheduler.report(urlsplit(url).netloc, blocked=True)
+                        return 403, b''
+                    chunks.append(chunk)
+                    received += len(chunk)
+                    if stop and stop(text):
+                        break
+                    if max_bytes and received >= max_bytes:
+                        break
+            metrics.add_bytes(received)
+            return response.status_code, b''.join(chunks)
+        finally:
+            response.close()
+
+    def stats(self):
+        """Contadores de reaproveitamento de conexões"""
+        with self._lock:
+            connections = self._counters['closed_connections']
+            requests_made = self._counters['closed_requests']
+            for entry in self._sessions.values():
+                host_connections, host_requests = self._connection_counts(entry['session'])
+                connections += host_connections
+                requests_made += host_requests
+
+            return {
+                'requests': self._counters['requests'],
+                'new_connections': connections,
+                # Requisições que usaram uma conexão já aberta (sem novo handshake)
+                'reused_connections': max(requests_made - connections, 0),
+                'active_hosts': len(self._sessions),
+                'sessions_created': self._counters['sessions_created'],
+                'sessions_expired': self._counters['sessions_expired'],
+            }
+
+    def close(self):
+        with self._lock:
+            for host in list(self._sessions):
+                self._close(host)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool():
+    """Retorna o pool do processo, criando na primeira chamada"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SessionPool(scheduler=get_scheduler())
+        return _pool
+
+
+def configure_session_pool(pool_size=10, idle_timeout=90):
+    """Troca o pool do processo por um com novos limites"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = SessionPool(pool_size=pool_size, idle_timeout=idle_timeout, scheduler=get_scheduler())
+        return _pool
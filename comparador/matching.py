@@ -0,0 +1,253 @@
+"""Agrupamento de anúncios do mesmo produto entre lojas diferentes.
+
+Cada título é normalizado com o mesmo tokenize() das consultas (minúsculas,
+sem acento, "iPhone13" -> "iphone 13", "128 GB" -> "128gb", sem palavras
+vazias) e vira um conjunto de tokens. Uma assinatura MinHash desse conjunto é
+fatiada em bandas (LSH): anúncios parecidos caem no mesmo balde em alguma
+banda, então cada anúncio novo só é comparado com os poucos candidatos dos
+seus baldes, e não com o índice inteiro. Os candidatos passam
+por uma verificação exata (Jaccard dos tokens + regras de acessório, versão,
+marca e especificação) e os pares aprovados são unidos num mesmo grupo.
+"""
+import functools
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+
+NUM_PERM = 64
+BANDS = 16                       # 16 bandas x 4 linhas: pares com Jaccard ~0,5 já viram candidatos
+ROWS = NUM_PERM // BANDS
+MIN_JACCARD = 0.5
+# Baldes muito cheios (anúncios quase iguais) não precisam de mais representantes
+BUCKET_LIMIT = 32
+
+_PRIME = (1 << 31) - 1
+
+STOPWORDS = {
+    'de', 'da', 'do', 'das', 'dos', 'e', 'com', 'para', 'pra', 'em', 'no', 'na', 'o', 'a', 'os', 'as',
+    'por', 'the', 'with', 'for', 'and', 'novo', 'original', 'lacrado', 'oferta', 'promocao', 'frete', 'gratis',
+}
+# Palavras que indicam acessório: "Capa para iPhone 13" não é um iPhone 13
+ACCESSORY_WORDS = {
+    'capa', 'capinha', 'case', 'pelicula', 'carregador', 'cabo', 'suporte', 'adaptador', 'protetor',
+    'bolsa', 'estojo', 'skin', 'adesivo', 'controle', 'refil', 'kit',
+}
+# Versões diferentes do mesmo modelo: "iPhone 13" não é o "iPhone 13 Pro Max" nem o "iPhone 13 Mini"
+VARIANT_WORDS = {'pro', 'max', 'mini', 'ultra', 'plus', 'lite'}
+# Marcas conhecidas: "Smart TV 55 LG" e "Smart TV 55 Samsung" são produtos diferentes
+BRANDS = {
+    'apple', 'samsung', 'motorola', 'xiaomi', 'realme', 'huawei', 'asus', 'nokia', 'lg', 'sony', 'tcl',
+    'philco', 'philips', 'panasonic', 'aoc', 'dell', 'lenovo', 'acer', 'hp', 'positivo', 'multilaser',
+    'jbl', 'edifier', 'qcy', 'logitech', 'redragon', 'razer', 'hyperx', 'mondial', 'arno', 'britania',
+    'electrolux', 'brastemp', 'consul', 'microsoft', 'nintendo',
+}
+UNITS = r'gb|tb|mb|mah|w|v|hz|pol|polegadas|cm|mm|ml|l|kg|g'
+# "+" é token: o "Galaxy S23+" não é o "Galaxy S23"
+_TOKEN = re.compile(r'[a-z]+|\d+(?:[.,]\d+)?|\+')
+_NUMBER = re.compile(r'\d+(?:[.,]\d+)?')
+# Ordinais saem antes do NFKD, que transformaria "5ª" em "5a"
+_ORDINALS = str.maketrans('', '', 'ªº°')
+# Unidades que ficam grudadas no número ("128 gb" -> "128gb"), mais 2m, 4k, 1080p e 2.4ghz
+UNIT_WORDS = frozenset(UNITS.split('|')) | {'m', 'k', 'p', 'ghz', 'mhz'}
+
+
+def tokenize(text):
+    """Tokens da forma canônica: 'Galaxy S 23 128 GB' -> ['galaxy', 's23', '128gb']
+
+    Usada nas consultas (queries.normalize_query) e nos títulos (normalize_title),
+    então "iPhone13" na busca e "iPhone 13" no anúncio dão os mesmos tokens.
+    """
+    text = unicodedata.normalize('NFKD', text.lower().translate(_ORDINALS))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    tokens = []
+    # O regex já separa letra de número: "iphone13" -> ["iphone", "13"]
+    words = list(_TOKEN.finditer(text))
+    # O que vem antes de cada token: nada, espaço ou hífen ("usb-c")
+    gaps = [text[words[i - 1].end():word.start()] if i else '' for i, word in enumerate(words)]
+    for i, word in enumerate(words):
+        token = word.group()
+        previous = tokens[-1] if tokens else ''
+        following = words[i + 1].group() if i + 1 < len(words) else ''
+        if (token[0].isdigit() and len(previous) == 1 and previous.isalpha() and previous not in 'eo'
+                and '-' not in gaps[i] + gaps[i - 1] and following not in UNIT_WORDS):
+            # Modelo de uma letra: "s 23" e "s23" -> "s23" ("e"/"o" soltos são palavras; "x 1tb" não é
+            # modelo; "usb-c 2" e "s-23" têm hífen, então a letra não é modelo)
+            tokens[-1] = previous + token
+        elif token in UNIT_WORDS and _NUMBER.fullmatch(previous):
+            tokens[-1] = previous + token
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def normalize_title(title):
+    """'Smartphone Apple iPhone 13 128 GB - Azul...' -> ['smartphone', 'apple', 'iphone', '13', '128gb', 'azul']"""
+    # "S23+" é o "S23 Plus"
+    return ['plus' if token == '+' else token for token in tokenize(title) if token not in STOPWORDS]
+
+
+@functools.lru_cache(maxsize=None)
+def _permutations():
+    """Coeficientes fixos (a, b) das NUM_PERM funções de hash, criados no primeiro uso"""
+    import numpy as np
+
+    rng = np.random.default_rng(20240521)
+    return (rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64),
+            rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64))
+
+
+def minhash(tokens):
+    """Assinatura MinHash (NUM_PERM inteiros) do conjunto de tokens"""
+    import numpy as np
+
+    a, b = _permutations()
+    hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for token in tokens),
+                         dtype=np.uint64, count=len(tokens))
+    # Uma linha por permutação, uma coluna por token: o mínimo de cada linha é a assinatura
+    return ((np.outer(a, hashes) + b[:, None]) % _PRIME).min(axis=1)
+
+
+class Listing:
+    __slots__ = ('tokens', 'is_accessory', 'specs', 'variants', 'brands')
+
+    def __init__(self, title):
+        tokens = normalize_title(title)
+        self.tokens = frozenset(tokens)
+        self.is_accessory = not ACCESSORY_WORDS.isdisjoint(self.tokens)
+        # Números e modelos ("13", "128gb", "s23"): precisam ser compatíveis
+        self.specs = frozenset(token for token in self.tokens if any(char.isdigit() for char in token))
+        self.variants = self.tokens & VARIANT_WORDS
+        self.brands = self.tokens & BRANDS
+
+
+def same_product(a, b):
+    """Verificação exata de um par candidato"""
+    if a.is_accessory != b.is_accessory or a.variants != b.variants:
+        return False
+    # Sem a marca no título não dá para saber; com marcas nos dois, precisam ter alguma em comum
+    if a.brands and b.brands and a.brands.isdisjoint(b.brands):
+        return False
+    # "iPhone 13" combina com "iPhone 13 128GB", mas não com "iPhone 14"
+    if a.specs and b.specs and not (a.specs <= b.specs or b.specs <= a.specs):
+        return False
+    union = len(a.tokens | b.tokens)
+    return union > 0 and len(a.tokens & b.tokens) / union >= MIN_JACCARD
+
+
+def _has_spec(listing, spec):
+    # "55" da consulta aparece como "55" ou "55polegadas" no título, mas não como "550"
+    return any(token == spec or (token.startswith(spec) and not token[len(spec)].isdigit())
+               for token in listing.specs)
+
+
+def matches_query(listing, wanted):
+    """O anúncio é o produto buscado? `wanted` é o Listing da consulta
+
+    Fica de fora o acessório (a não ser que a consulta seja de acessório), outra
+    versão ("Pro", "Mini"...), outra marca, outro número de modelo e o anúncio
+    que não tem pelo menos metade das palavras da consulta.
+    """
+    if listing.is_accessory != wanted.is_accessory or listing.variants != wanted.variants:
+        return False
+    if wanted.brands and listing.brands and wanted.brands.isdisjoint(listing.brands):
+        return False
+    if not all(_has_spec(listing, spec) for spec in wanted.specs):
+        return False
+    words = wanted.tokens - wanted.specs
+    return len(words & listing.tokens) * 2 >= len(words)
+
+
+def query_filter(query):
+    """Função produto (dict com 'produto') -> bool: só os anúncios do produto buscado"""
+    # A consulta na forma canônica (a mesma de queries.normalize_query, chave do cache)
+    wanted = Listing(' '.join(tokenize(query)))
+    return lambda product: matches_query(Listing(product['produto']), wanted)
+
+
+class ProductIndex:
+    """Índice incremental: add() devolve o grupo do anúncio em tempo sublinear"""
+
+    def __init__(self):
+        self._listings = []
+        self._parent = []                    # union-find dos grupos
+        self._buckets = defaultdict(list)    # (banda, valores da banda) -> ids
+        self._exact = {}                     # tokens -> id (títulos iguais depois de normalizar)
+
+    def __len__(self):
+        return len(self._listings)
+
+    def _find(self, listing_id):
+        root = listing_id
+        while self._parent[root] != root:
+            root = self._parent[root]
+        # Compressão de caminho
+        while self._parent[listing_id] != root:
+            self._parent[listing_id], listing_id = root, self._parent[listing_id]
+        return root
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            # O grupo mais antigo dá o nome (ids estáveis conforme o índice cresce)
+            self._parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def add(self, title):
+        """Indexa um título e devolve o id do grupo dele"""
+        listing = Listing(title)
+        listing_id = len(self._listings)
+        self._listings.append(listing)
+        self._parent.append(listing_id)
+
+        same = self._exact.get((listing.tokens, listing.is_accessory))
+        if same is not None:
+            self._parent[listing_id] = self._find(same)
+            return self._find(listing_id)
+        self._exact[(listing.tokens, listing.is_accessory)] = listing_id
+
+        if not listing.tokens:
+            return listing_id
+
+        signature = minhash(sorted(listing.tokens))
+        candidates = set()
+        for band in range(BANDS):
+            key = (band, signature[band * ROWS:(band + 1) * ROWS].tobytes())
+            bucket = self._buckets[key]
+            candidates.update(bucket)
+            if len(bucket) < BUCKET_LIMIT:
+                bucket.append(listing_id)
+
+        for candidate in candidates:
+            if same_product(listing, self._listings[candidate]):
+                self._union(listing_id, candidate)
+        return self._find(listing_id)
+
+    def group_of(self, listing_id):
+        return self._find(listing_id)
+
+
+def group_listings(products):
+    """Ids de grupo para uma lista de produtos (dicts com 'produto'), na mesma ordem"""
+    index = ProductIndex()
+    return [index.add(product['produto']) for product in products]
+
+
+def comparison_group(products, query=None):
+    """Anúncios do produto principal: o grupo com mais lojas (e, no empate, mais anúncios)
+
+    Com a consulta, só disputam os grupos com algum anúncio do produto buscado
+    (matches_query); sem ela, os grupos que não são de acessório. Só quando
+    nenhum grupo passa é que todos disputam.
+    """
+    if not products:
+        return []
+    members = defaultdict(list)
+    for product, group in zip(products, group_listings(products)):
+        members[group].append(product)
+    groups = list(members.values())
+    if query:
+        is_wanted = query_filter(query)
+        preferred = [group for group in groups if any(is_wanted(product) for product in group)]
+    else:
+        preferred = [group for group in groups if not Listing(group[0]['produto']).is_accessory]
+    return max(preferred or groups, key=lambda group: (len({p['site'] for p in group}), len(group)))
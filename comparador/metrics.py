@@ -0,0 +1,246 @@
+"""Medição de tempo por etapa das buscas e exportação no formato do Prometheus.
+
+Cada busca de loja abre um "trace" na thread que a executa; dentro dele, as
+etapas (fila do rate limit, conexão, primeiro byte, download, parsing e
+extração) são medidas com `stage()`. Etapas aninhadas descontam o tempo das
+filhas, então cada número é o tempo próprio da etapa.
+
+Configuração por variáveis de ambiente:
+    COMPARADOR_METRICS_PORT=9108      servidor HTTP com /metrics
+    COMPARADOR_METRICS_FILE=metrics.prom   arquivo reescrito a cada busca
+    COMPARADOR_PROFILE_DIR=perfis/    um .prof do cProfile por busca de loja
+"""
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+STAGES = ('queue', 'connect', 'ttfb', 'download', 'parse', 'extract')
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+
+_local = threading.local()
+_lock = threading.Lock()
+
+# (site, etapa) -> [contagem por bucket..., soma, total]
+_histograms = defaultdict(lambda: [0] * (len(BUCKETS) + 2))
+# (nome, site, rótulo extra) -> valor
+_counters = defaultdict(float)
+_recent = deque(maxlen=50)
+_server = None
+
+
+class Trace:
+    def __init__(self, site, query):
+        self.site = site
+        self.query = query
+        self.started_at = time.time()
+        self.stages = defaultdict(float)
+        self.bytes_received = 0
+        self.results = 0
+        self.outcome = 'ok'
+        self._children = [0.0]
+
+    def as_row(self):
+        row = {'site': self.site, 'consulta': self.query, 'resultado': self.outcome,
+               'produtos': self.results, 'kb': round(self.bytes_received / 1024, 1)}
+        for name in STAGES:
+            row[f'{name}_ms'] = round(self.stages.get(name, 0.0) * 1000, 1)
+        row['total_ms'] = round(self.stages.get('total', 0.0) * 1000, 1)
+        return row
+
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+
+@contextmanager
+def trace(site, query):
+    """Mede uma busca inteira de uma loja na thread atual"""
+    tr = Trace(site, query)
+    previous = current_trace()
+    _local.trace = tr
+    start = time.perf_counter()
+    try:
+        yield tr
+    except Exception:
+        tr.outcome = 'error'
+        raise
+    finally:
+        tr.stages['total'] = time.perf_counter() - start
+        _local.trace = previous
+        _finish(tr)
+
+
+@contextmanager
+def stage(name):
+    """Mede uma etapa; sem trace ativo não faz nada"""
+    tr = current_trace()
+    if tr is None:
+        yield
+        return
+
+    tr._children.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        children = tr._children.pop()
+        tr.stages[name] += elapsed - children
+        tr._children[-1] += elapsed
+
+
+def record_stage(name, seconds):
+    """Registra uma duração já medida (ex: conexão aberta pelo urllib3)"""
+    tr = current_trace()
+    if tr is not None:
+        tr.stages[name] += seconds
+        tr._children[-1] += seconds
+
+
+def add_bytes(count):
+    tr = current_trace()
+    if tr is not None:
+        tr.bytes_received += count
+
+
+def set_outcome(outcome):
+    """Marca o resultado da busca atual (ex: 'not_modified' quando a loja respondeu 304)"""
+    tr = current_trace()
+    if tr is not None:
+        tr.outcome = outcome
+
+
+def _observe(site, name, seconds):
+    histogram = _histograms[(site, name)]
+    for i, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            histogram[i] += 1
+    histogram[-2] += seconds
+    histogram[-1] += 1
+
+
+def _finish(tr):
+    with _lock:
+        for name, seconds in tr.stages.items():
+            _observe(tr.site, name, seconds)
+        _counters[('bytes_received_total', tr.site, '')] += tr.bytes_received
+        _counters[('products_found_total', tr.site, '')] += tr.results
+        _counters[('searches_total', tr.site, tr.outcome)] += 1
+        _recent.appendleft(tr.as_row())
+
+    path = os.environ.get('COMPARADOR_METRICS_FILE')
+    if path:
+        # Falha na exportação não pode derrubar a busca que acabou de ser medida
+        try:
+            write_metrics_file(path)
+        except Exception as e:
+            print(f"Erro ao gravar as métricas em {path}: {e}")
+
+
+def observe(name, seconds, site='todas'):
+    """Registra uma duração fora de um trace (ex: tempo até o primeiro resultado)"""
+    with _lock:
+        _observe(site, name, seconds)
+
+
+def recent_traces():
+    """Últimas buscas medidas, da mais nova para a mais antiga"""
+    with _lock:
+        return list(_recent)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def render_prometheus():
+    """Todas as métricas no formato texto do Prometheus"""
+    lines = [
+        '# HELP comparador_stage_seconds Tempo próprio de cada etapa da busca por loja',
+        '# TYPE comparador_stage_seconds histogram',
+    ]
+    with _lock:
+        for (site, name), histogram in sorted(_histograms.items()):
+            labels = f'site="{_escape(site)}",stage="{_escape(name)}"'
+            for bound, count in zip(BUCKETS, histogram):
+                lines.append(f'comparador_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'comparador_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]}')
+            lines.append(f'comparador_stage_seconds_sum{{{labels}}} {histogram[-2]:.6f}')
+            lines.append(f'comparador_stage_seconds_count{{{labels}}} {histogram[-1]}')
+
+        declared = set()
+        for (name, site, outcome), value in sorted(_counters.items()):
+            if name not in declared:
+                lines.append(f'# TYPE comparador_{name} counter')
+                declared.add(name)
+            labels = f'site="{_escape(site)}"'
+            if outcome:
+                labels += f',outcome="{_escape(outcome)}"'
+            lines.append(f'comparador_{name}{{{labels}}} {value:g}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics_file(path):
+    """Grava as métricas de forma atômica (quem lê nunca vê arquivo pela metade)
+
+    Cada chamada usa o seu próprio temporário na mesma pasta: buscas terminando
+    juntas em threads diferentes não trocam o arquivo uma da outra.
+    """
+    import tempfile
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp',
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(render_prometheus())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def start_metrics_server(port=None):
+    """Sobe o /metrics uma vez por processo (porta do argumento ou de COMPARADOR_METRICS_PORT)"""
+    global _server
+    port = port or os.environ.get('COMPARADOR_METRICS_PORT')
+    with _lock:
+        if _server is not None or not port:
+            return _server
+        # http.server só é importado quando o /metrics é ligado
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') != '/metrics':
+                    self.send_error(404)
+                    return
+                body = render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        _server = ThreadingHTTPServer(('0.0.0.0', int(port)), MetricsHandler)
+        _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def profile_call(profile_dir, label, func, *args):
+    """Roda func no cProfile e grava o .prof em profile_dir"""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args)
+    finally:
+        os.makedirs(profile_dir, exist_ok=True)
+        slug = re.sub(r'[^a-z0-9]+', '-', label.lower()).strip('-')
+        profiler.dump_stats(os.path.join(profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}.prof"))
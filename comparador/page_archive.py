@@ -0,0 +1,201 @@
+"""Arquivo das páginas baixadas, comprimidas e guardadas pelo hash do conteúdo.
+
+Cada download vira uma linha em fetches (URL, loja, horário, ETag e
+Last-Modified da resposta) que aponta para o SHA-256 da página; a página em
+si fica uma vez só em pages, comprimida com zlib, não importa quantas vezes
+veio igual. Os produtos extraídos também ficam guardados, por URL e página
+(o link de reserva de cada produto é a própria URL de busca).
+
+Com isso a próxima busca da mesma URL vai condicional (If-None-Match /
+If-Modified-Since): se a loja responder 304, os produtos já extraídos são
+reaproveitados sem baixar nem extrair de novo. E quando uma loja muda o HTML,
+replay.py roda os extratores de novo sobre as páginas guardadas, sem internet.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from .result_cache import CACHE_DIR
+
+DEFAULT_PATH = os.path.join(CACHE_DIR, 'paginas.sqlite3')
+DAY = 24 * 60 * 60
+
+
+class PageArchive:
+    def __init__(self, path=DEFAULT_PATH, level=6):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.level = level
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS fetches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                site TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                status INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            );
+            CREATE INDEX IF NOT EXISTS fetches_by_url ON fetches (url, id);
+            CREATE INDEX IF NOT EXISTS fetches_by_time ON fetches (fetched_at);
+            CREATE TABLE IF NOT EXISTS extractions (
+                url TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                products TEXT NOT NULL,
+                extracted_at REAL NOT NULL,
+                PRIMARY KEY (url, sha256)
+            );
+        """)
+        self._db.commit()
+
+    def store(self, site, url, content, headers=None, fetched_at=None):
+        """Guarda a página (se ainda não existe) e registra o download; retorna o SHA-256"""
+        sha256 = hashlib.sha256(content).hexdigest()
+        headers = headers or {}
+        with self._lock, self._db:
+            exists = self._db.execute("SELECT 1 FROM pages WHERE sha256 = ?", (sha256,)).fetchone()
+            if not exists:
+                # Só comprime página nova: a mesma página baixada de novo não custa nada
+                self._db.execute("INSERT INTO pages (sha256, size, data) VALUES (?, ?, ?)",
+                                 (sha256, len(content), zlib.compress(content, self.level)))
+            self._record(site, url, sha256, 200, headers, fetched_at)
+        return sha256
+
+    def revalidated(self, site, url, sha256, headers=None):
+        """Registra um 304: a página arquivada continua valendo"""
+        with self._lock, self._db:
+            self._record(site, url, sha256, 304, headers or {}, None)
+
+    def _record(self, site, url, sha256, status, headers, fetched_at):
+        headers = {name.lower(): value for name, value in headers.items()}
+        previous = self._latest(url) if status == 304 else None
+        # Um 304 pode vir sem os validadores: ficam os da resposta anterior
+        etag = headers.get('etag') or (previous and previous['etag'])
+        last_modified = headers.get('last-modified') or (previous and previous['last_modified'])
+        self._db.execute(
+            "INSERT INTO fetches (url, site, sha256, fetched_at, status, etag, last_modified) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, site, sha256, fetched_at or time.time(), status, etag, last_modified)
+        )
+
+    def _latest(self, url):
+        row = self._db.execute(
+            "SELECT sha256, fetched_at, etag, last_modified FROM fetches WHERE url = ? ORDER BY id DESC LIMIT 1",
+            (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'sha256': row[0], 'fetched_at': row[1], 'etag': row[2], 'last_modified': row[3]}
+
+    def latest(self, url):
+        """Último download da URL: {'sha256', 'fetched_at', 'etag', 'last_modified'} ou None"""
+        with self._lock:
+            return self._latest(url)
+
+    def conditional_headers(self, url):
+        """(sha256, cabeçalhos If-None-Match/If-Modified-Since) do último download; (None, {}) sem validador"""
+        latest = self.latest(url)
+        if latest is None:
+            return None, {}
+        headers = {}
+        if latest['etag']:
+            headers['If-None-Match'] = latest['etag']
+        if latest['last_modified']:
+            headers['If-Modified-Since'] = latest['last_modified']
+        return (latest['sha256'], headers) if headers else (None, {})
+
+    def page(self, sha256):
+        """Conteúdo original da página (bytes) ou None"""
+        with self._lock:
+            row = self._db.execute("SELECT data FROM pages WHERE sha256 = ?", (sha256,)).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def products(self, url, sha256):
+        """Produtos extraídos da página baixada da URL, ou None se ainda não foram guardados"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT products FROM extractions WHERE url = ? AND sha256 = ?", (url, sha256)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_products(self, url, sha256, products):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO extractions (url, sha256, products, extracted_at) VALUES (?, ?, ?, ?)",
+                (url, sha256, json.dumps(products, ensure_ascii=False), time.time())
+            )
+
+    def latest_pages(self, site=None, since=None):
+        """[(site, url, sha256, horário)] da página mais recente de cada URL, para o replay"""
+        conditions, params = [], []
+        if site:
+            conditions.append("site = ?")
+            params.append(site)
+        if since:
+            conditions.append("fetched_at >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self._lock:
+            return self._db.execute(
+                f"SELECT site, url, sha256, fetched_at FROM fetches WHERE id IN "
+                f"(SELECT MAX(id) FROM fetches {where} GROUP BY url) ORDER BY site, url",
+                params
+            ).fetchall()
+
+    def prune(self, older_than_days=30, now=None):
+        """Apaga downloads antigos (menos o último de cada URL) e as páginas que ficaram sem uso"""
+        cutoff = (now or time.time()) - older_than_days * DAY
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM fetches WHERE fetched_at < ? AND id NOT IN (SELECT MAX(id) FROM fetches GROUP BY url)",
+                (cutoff,)
+            )
+            removed = self._db.execute(
+                "DELETE FROM pages WHERE sha256 NOT IN (SELECT sha256 FROM fetches)"
+            ).rowcount
+            self._db.execute(
+                "DELETE FROM extractions WHERE NOT EXISTS "
+                "(SELECT 1 FROM fetches WHERE fetches.url = extractions.url AND fetches.sha256 = extractions.sha256)"
+            )
+        return removed
+
+    def stats(self):
+        with self._lock:
+            pages, size, stored = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM pages"
+            ).fetchone()
+            fetches, not_modified = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(status = 304), 0) FROM fetches"
+            ).fetchone()
+        return {'pages': pages, 'fetches': fetches, 'not_modified': not_modified,
+                'size_bytes': size, 'stored_bytes': stored}
+
+    def close(self):
+        self._db.close()
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_page_archive():
+    """Retorna o arquivo de páginas do processo, criando na primeira chamada"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = PageArchive()
+        return _archive
@@ -0,0 +1,125 @@
+"""Camada de parsing HTML usada pelos extratores dos sites.
+
+Usa o lxml quando está instalado (bem mais rápido que o html.parser puro
+Python) e monta só as partes da página que interessam: o resto do HTML é
+lido pelo tokenizador mas nunca vira objeto na árvore. O bs4 só é importado
+no primeiro parsing.
+"""
+import importlib.util
+import re
+from html.parser import HTMLParser
+
+from . import metrics
+
+# find_spec só procura o módulo, sem carregar o lxml
+PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
+
+class TagFilter:
+    """Filtro para o parse_only do BeautifulSoup (bs4 >= 4.13) baseado em funções.
+
+    match_tag(nome, atributos) decide quais tags entram na árvore (com toda a
+    subárvore); match_string(texto) decide quais textos soltos entram.
+    """
+    includes_everything = False
+    excludes_everything = False
+
+    def __init__(self, match_tag, match_string=None):
+        self.match_tag = match_tag
+        self.match_string = match_string
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return bool(self.match_tag(name, attrs or {}))
+
+    def allow_string_creation(self, string):
+        return bool(self.match_string and self.match_string(string))
+
+
+def has_class(attrs, class_name):
+    """Confere a classe nos atributos crus (antes do bs4 separar a lista)"""
+    classes = attrs.get('class') or ''
+    if not isinstance(classes, str):
+        classes = ' '.join(classes)
+    return class_name in classes.split()
+
+
+def make_soup(content, parse_only=None):
+    """Cria o BeautifulSoup com o parser mais rápido disponível"""
+    from bs4 import BeautifulSoup
+
+    with metrics.stage('parse'):
+        return BeautifulSoup(content, PARSER, parse_only=parse_only)
+
+
+PRICE_TEXT_REGEX = re.compile(r'R\$\s*\d+')
+BUSCAPE_PRODUCT_TESTID = re.compile('product')
+
+
+def is_mercadolivre_card(name, attrs):
+    return name == 'div' and has_class(attrs, 'ui-search-result__wrapper')
+
+
+def is_buscape_card(name, attrs):
+    return name == 'div' and bool(
+        has_class(attrs, 'ProductCard_ProductCard_Inner__7JhKb')
+        or BUSCAPE_PRODUCT_TESTID.search(attrs.get('data-testid') or '')
+    )
+
+
+def is_heading(name, attrs):
+    return name in ('h1', 'h2', 'h3', 'h4')
+
+
+# Mercado Livre: só os cards de resultado
+MERCADOLIVRE_FILTER = TagFilter(is_mercadolivre_card)
+
+# Buscapé: cards de produto e links (alguns cards ficam dentro de um <a>)
+BUSCAPE_FILTER = TagFilter(lambda name, attrs: name == 'a' or is_buscape_card(name, attrs))
+
+# Zoom: títulos e textos com cara de preço
+ZOOM_FILTER = TagFilter(is_heading, match_string=PRICE_TEXT_REGEX.search)
+
+
+class CardWatcher(HTMLParser):
+    """Acompanha o HTML chegando em pedaços e avisa quando já há cards suficientes.
+
+    Um card conta quando a tag que o abriu é fechada. Com match_string, também
+    é preciso ter visto pelo menos um texto que passe no teste (ex: um preço).
+    """
+
+    def __init__(self, match_tag, cards=3, match_string=None):
+        super().__init__()
+        self.match_tag = match_tag
+        self.cards = cards
+        self.match_string = match_string
+        self.complete = 0
+        self.strings_found = 0
+        self._open_tag = None
+        self._level = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._open_tag is None:
+            if self.match_tag(tag, dict(attrs)):
+                self._open_tag = tag
+                self._level = 1
+        elif tag == self._open_tag:
+            self._level += 1
+
+    def handle_endtag(self, tag):
+        if tag == self._open_tag:
+            self._level -= 1
+            if self._level == 0:
+                self._open_tag = None
+                self.complete += 1
+
+    def handle_data(self, data):
+        if self.match_string and self.match_string(data):
+            self.strings_found += 1
+
+    def is_done(self):
+        return self.complete >= self.cards and (self.match_string is None or self.strings_found > 0)
+
+    def feed_chunk(self, text):
+        """Processa mais um pedaço do HTML e diz se já dá para parar o download"""
+        self.feed(text)
+        return self.is_done()
@@ -0,0 +1,146 @@
+"""Histórico de preços em SQLite: só recebe inserções e responde consultas por período.
+
+Cada produto encontrado numa busca nova vira uma linha (consulta, site,
+produto, preço, link, horário). O índice (consulta, horário, preço) cobre a
+consulta por período inteira, então ler os preços de 90 dias de um produto
+não toca na tabela, mesmo com milhões de linhas. As estatísticas (mínimo,
+mediana, percentis) são calculadas com NumPy sobre o array de preços.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from .queries import normalize_query
+from .result_cache import CACHE_DIR
+
+DEFAULT_PATH = os.path.join(CACHE_DIR, 'historico.sqlite3')
+DAY = 24 * 60 * 60
+
+
+class PriceHistory:
+    def __init__(self, path=DEFAULT_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # WAL: leituras não esperam as gravações das buscas
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS prices (
+                query TEXT NOT NULL,
+                site TEXT NOT NULL,
+                produto TEXT NOT NULL,
+                preco REAL NOT NULL,
+                link TEXT,
+                recorded_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS prices_by_query ON prices (query, recorded_at, preco);
+            CREATE INDEX IF NOT EXISTS prices_by_product ON prices (site, produto, recorded_at);
+        """)
+        self._db.commit()
+
+    def append(self, query, products, recorded_at=None):
+        """Grava os produtos de uma busca numa única transação"""
+        recorded_at = recorded_at or time.time()
+        query = normalize_query(query)
+        rows = [(query, p['site'], p['produto'], p['preco'], p.get('link'), recorded_at) for p in products]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO prices (query, site, produto, preco, link, recorded_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def prices_between(self, query, since, until=None):
+        """Array float64 com os preços da consulta no período (timestamps em segundos)"""
+        import numpy as np
+
+        until = until or time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "SELECT preco FROM prices WHERE query = ? AND recorded_at BETWEEN ? AND ?",
+                (normalize_query(query), since, until)
+            )
+            return np.fromiter((row[0] for row in cursor), dtype='float64')
+
+    def query_counts(self):
+        """[(consulta, vezes que foi buscada)]; cada busca grava todos os produtos com o mesmo horário"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT query, COUNT(DISTINCT recorded_at) FROM prices GROUP BY query"
+            ).fetchall()
+
+    def product_history(self, site, produto, since=0.0, until=None):
+        """(horários, preços) de um produto específico de uma loja, em ordem cronológica"""
+        import numpy as np
+
+        until = until or time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT recorded_at, preco FROM prices WHERE site = ? AND produto = ? "
+                "AND recorded_at BETWEEN ? AND ? ORDER BY recorded_at",
+                (site, produto, since, until)
+            ).fetchall()
+        data = np.array(rows, dtype='float64').reshape(-1, 2)
+        return data[:, 0], data[:, 1]
+
+    def stats(self, query, days, now=None):
+        """Mínimo, mediana e percentis dos últimos `days` dias (None sem histórico)"""
+        import numpy as np
+
+        now = now or time.time()
+        prices = self.prices_between(query, now - days * DAY, now)
+        if not len(prices):
+            return None
+        p10, p25, median, p75, p90 = np.percentile(prices, [10, 25, 50, 75, 90])
+        return {
+            'days': days,
+            'count': len(prices),
+            'min': float(prices.min()),
+            'p10': float(p10),
+            'p25': float(p25),
+            'median': float(median),
+            'p75': float(p75),
+            'p90': float(p90),
+            'max': float(prices.max()),
+        }
+
+    def compact(self, older_than_days=90, now=None):
+        """Junta as linhas antigas em uma por (consulta, site, produto, dia), com o menor preço do dia
+
+        Retorna quantas linhas foram removidas.
+        """
+        cutoff = (now or time.time()) - older_than_days * DAY
+        with self._lock, self._db:
+            before = self._db.execute("SELECT COUNT(*) FROM prices WHERE recorded_at < ?", (cutoff,)).fetchone()[0]
+            self._db.execute("""
+                CREATE TEMP TABLE compacted AS
+                SELECT query, site, produto, MIN(preco) AS preco, MAX(link) AS link,
+                       CAST(recorded_at / ? AS INTEGER) * ? AS recorded_at
+                FROM prices WHERE recorded_at < ?
+                GROUP BY query, site, produto, CAST(recorded_at / ? AS INTEGER)
+            """, (DAY, DAY, cutoff, DAY))
+            self._db.execute("DELETE FROM prices WHERE recorded_at < ?", (cutoff,))
+            self._db.execute("INSERT INTO prices SELECT * FROM compacted")
+            after = self._db.execute("SELECT COUNT(*) FROM compacted").fetchone()[0]
+            self._db.execute("DROP TABLE compacted")
+        return before - after
+
+    def vacuum(self):
+        """Devolve ao disco o espaço liberado pela compactação"""
+        with self._lock:
+            self._db.execute("VACUUM")
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_price_history():
+    """Histórico compartilhado pelo processo"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = PriceHistory()
+        return _history
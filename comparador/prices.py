@@ -0,0 +1,102 @@
+"""Conversão de textos de preço brasileiros ("R$ 1.234,56") para número.
+
+parse_price trata um texto por vez. parse_prices trata uma lista, Series ou
+array inteiro de uma vez e devolve um array float64 (NaN onde não há preço):
+com o pyarrow instalado, roda nos kernels de string do Arrow (RE2, em C++);
+sem ele, cai num laço com os padrões já compilados. O NumPy só é importado
+por parse_prices.
+"""
+import re
+
+# Mesmos padrões e mesma ordem de prioridade do clean_price original
+NUMBER = r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)'
+PRICE_WITH_CURRENCY = re.compile(r'R\$\s*' + NUMBER)   # R$ 1.234,56
+PRICE_NUMBER = re.compile(NUMBER)                      # 1.234,56
+PRICE_PLAIN = re.compile(r'(\d+(?:,\d{2})?)')          # 1234,56
+PRICE_PATTERNS = (PRICE_WITH_CURRENCY, PRICE_NUMBER, PRICE_PLAIN)
+
+# Os mesmos padrões em RE2. O \s do Python também aceita espaços Unicode
+# (o \xa0 é comum em "R$\xa01.234"), então a classe é escrita por extenso.
+RE2_SPACE = r'[\t\n\x{0b}\f\r\x{1c}-\x{1f}\x{85}\p{Z}]'
+RE2_NUMBER = r'(?P<valor>[0-9]{1,3}(?:\.[0-9]{3})*(?:,[0-9]{2})?)'
+RE2_PRICE_WITH_CURRENCY = r'R\$' + RE2_SPACE + '*' + RE2_NUMBER
+RE2_PRICE_NUMBER = RE2_NUMBER
+NON_ASCII_DIGIT = r'[^\P{Nd}0-9]'
+
+
+def to_float(price_str):
+    """'1.234,56' -> 1234.56"""
+    return float(price_str.replace('.', '').replace(',', '.'))
+
+
+def parse_price(price_text):
+    """Extrai o valor numérico de um texto de preço (None se não houver)"""
+    if not price_text:
+        return None
+
+    for pattern in PRICE_PATTERNS:
+        match = pattern.search(price_text)
+        if match:
+            try:
+                return to_float(match.group(1))
+            except ValueError:
+                continue
+
+    return None
+
+
+def parse_prices(values):
+    """Converte vários textos de preço de uma vez; retorna np.ndarray float64 com NaN"""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        return _parse_prices_loop(values)
+    return _parse_prices_arrow(pa, pc, values)
+
+
+def _parse_prices_loop(values):
+    import numpy as np
+
+    return np.fromiter(
+        (np.nan if price is None else price for price in map(_parse_text, values)),
+        dtype='float64', count=len(values)
+    )
+
+
+def _parse_text(value):
+    return parse_price(value) if isinstance(value, str) else None
+
+
+def _extract(pa, pc, texts, pattern):
+    matches = pc.extract_regex(texts, pattern)
+    # Linha sem casamento vira nulo (e não string vazia)
+    return pc.if_else(pc.is_null(matches), pa.scalar(None, pa.string()), pc.struct_field(matches, [0]))
+
+
+def _parse_prices_arrow(pa, pc, values):
+    import numpy as np
+
+    texts = pa.array(values, type=pa.string(), from_pandas=True)
+
+    # "R$ ..." tem prioridade; só as linhas sem ele tentam o número solto.
+    # O terceiro padrão nunca é necessário: qualquer dígito já casa com o segundo.
+    numbers = _extract(pa, pc, texts, RE2_PRICE_WITH_CURRENCY)
+    missing = pc.is_null(numbers)
+    if pc.any(missing).as_py():
+        fallback = _extract(pa, pc, pc.filter(texts, missing), RE2_PRICE_NUMBER)
+        numbers = pc.replace_with_mask(numbers, missing, fallback)
+
+    numbers = pc.replace_substring(pc.replace_substring(numbers, '.', ''), ',', '.')
+    result = pc.cast(numbers, pa.float64()).to_numpy(zero_copy_only=False)
+
+    # O \d do Python aceita dígitos de outros alfabetos (ex: "١٢٣") e o RE2 não: toda
+    # linha com esses dígitos é refeita uma a uma, mesmo as que já deram um número
+    # ("82٣" é 823 no parse_price, mas só 82 para o RE2)
+    other_digits = pc.fill_null(pc.match_substring_regex(texts, NON_ASCII_DIGIT), False)
+    if pc.any(other_digits).as_py():
+        for i in np.flatnonzero(other_digits.to_numpy(zero_copy_only=False)):
+            price = parse_price(texts[i].as_py())
+            result[i] = np.nan if price is None else price
+
+    return result
@@ -0,0 +1,154 @@
+"""Consultas na forma canônica e sugestões instantâneas por prefixo.
+
+normalize_query() é a chave de tudo que é guardado por consulta (cache de
+resultados, histórico, buscas juntadas da API): "iPhone13", "IPHONE 13 " e
+"iphone  13" viram "iphone 13", então caem no mesmo resultado já pronto em
+vez de cada uma disparar uma busca nova nas lojas. É só a chave: as lojas
+recebem o texto que a pessoa digitou.
+
+QueryIndex guarda as consultas numa lista ordenada: cada consulta entra uma
+vez para cada palavra em que pode começar ("notebook dell" e "dell"), e um
+prefixo vira uma faixa da lista achada com bisect. Prefixos curtos, que
+casam com muita coisa, têm o resultado guardado até o índice mudar.
+"""
+import bisect
+import heapq
+import threading
+import time
+
+from .matching import tokenize
+
+
+def normalize_query(query):
+    """'  iPhone13 ' -> 'iphone 13'; 'Galaxy S 23 128 GB' -> 'galaxy s23 128gb'; 'Televisão' -> 'televisao'
+
+    'Galaxy S23+' -> 'galaxy s23 +'; 'Cabo USB-C 2m' -> 'cabo usb c 2m'; 'Echo Dot 5ª' -> 'echo dot 5'
+    """
+    return ' '.join(tokenize(query))
+
+
+class QueryIndex:
+    # Faixas maiores que isso (prefixos de 1 ou 2 letras) têm o resultado guardado
+    SCAN_LIMIT = 256
+    # Quantas sugestões ficam guardadas por prefixo
+    TOP_CACHED = 20
+
+    def __init__(self, warm_for=None):
+        # warm_for: segundos em que uma consulta buscada ainda tem resultado pronto no cache
+        self.warm_for = warm_for
+        self.weights = {}        # consulta -> buscas feitas (0 para nomes do catálogo)
+        self.searched_at = {}    # consulta -> horário da última busca
+        self._entries = []       # 'palavras\x00consulta', em ordem
+        self._top = {}           # prefixo -> melhores consultas
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.weights)
+
+    @staticmethod
+    def _keys(query):
+        words = query.split(' ')
+        return [f"{' '.join(words[i:])}\x00{query}" for i in range(len(words))]
+
+    def add(self, query, weight=1, searched_at=None):
+        """Conta mais `weight` buscas da consulta (que entra no índice se ainda não estiver)"""
+        query = normalize_query(query)
+        if not query:
+            return
+        with self._lock:
+            if query not in self.weights:
+                self.weights[query] = 0
+                for key in self._keys(query):
+                    bisect.insort(self._entries, key)
+            self.weights[query] += weight
+            if searched_at:
+                self.searched_at[query] = max(searched_at, self.searched_at.get(query, 0))
+            # Só esta consulta subiu no ranking: nos prefixos guardados dela, disputa com os que já estão lá
+            for key in self._keys(query):
+                words = key.partition('\x00')[0]
+                for size in range(1, len(words) + 1):
+                    prefix = words[:size]
+                    top = self._top.get(prefix)
+                    if top is not None:
+                        self._top[prefix] = heapq.nsmallest(self.TOP_CACHED, set(top) | {query},
+                                                            key=lambda q: self._rank(q, prefix))
+
+    def update(self, items):
+        """Junta muitas (consulta, buscas, horário) de uma vez, ordenando a lista uma vez só"""
+        with self._lock:
+            for query, weight, searched_at in items:
+                query = normalize_query(query)
+                if not query:
+                    continue
+                if query not in self.weights:
+                    self.weights[query] = 0
+                    self._entries.extend(self._keys(query))
+                self.weights[query] += weight
+                if searched_at:
+                    self.searched_at[query] = max(searched_at, self.searched_at.get(query, 0))
+            self._entries.sort()
+            self._top.clear()
+
+    def _rank(self, query, prefix):
+        # Primeiro quem começa com o prefixo, depois as mais buscadas, depois as mais curtas
+        return (not query.startswith(prefix), -self.weights[query], len(query), query)
+
+    def suggest(self, prefix, limit=5, now=None):
+        """[{'query', 'searches', 'warm'}] das consultas com alguma palavra começando pelo prefixo"""
+        prefix = normalize_query(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            queries = self._top.get(prefix)
+            if queries is None:
+                lo = bisect.bisect_left(self._entries, prefix)
+                hi = bisect.bisect_left(self._entries, prefix + '\uffff', lo)
+                candidates = {entry.rpartition('\x00')[2] for entry in self._entries[lo:hi]}
+                queries = heapq.nsmallest(self.TOP_CACHED, candidates, key=lambda q: self._rank(q, prefix))
+                if hi - lo > self.SCAN_LIMIT:
+                    self._top[prefix] = queries
+            now = now or time.time()
+            return [{
+                'query': query,
+                'searches': self.weights[query],
+                'warm': bool(self.warm_for and now - self.searched_at.get(query, 0) <= self.warm_for),
+            } for query in queries[:limit]]
+
+
+def catalog_names():
+    """Nomes de produto do catálogo ('Notebook', 'Notebook Dell', ...) para sugerir mesmo sem histórico"""
+    from .synthetic import CATEGORIES
+
+    for category in CATEGORIES:
+        for kind in category['kinds']:
+            yield kind
+            for brand in category['brands']:
+                yield f"{kind} {brand}"
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_query_index():
+    """Índice do processo, montado na primeira chamada com as buscas já feitas e o catálogo"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from .price_history import get_price_history
+            from .result_cache import get_result_cache
+
+            cache = get_result_cache()
+            index = QueryIndex(warm_for=max(cache.ttls.values(), default=cache.default_ttl) + cache.stale_ttl)
+            index.update((name, 0, None) for name in catalog_names())
+            index.update((query, searches, None) for query, searches in get_price_history().query_counts())
+            # Consultas com resultado no cache: só o horário (as buscas já vieram do histórico)
+            index.update((query, 0, stored_at) for query, stored_at in cache.queries())
+            _index = index
+        return _index
+
+
+def record_search(query, searched_at=None):
+    """Conta uma busca feita no índice do processo (se ele já foi montado)"""
+    if _index is not None:
+        _index.add(query, searched_at=searched_at or time.time())
@@ -0,0 +1,46 @@
+"""Seleção dos K produtos mais baratos sem ordenar (nem guardar) tudo.
+
+cheapest() consome um iterável, como o gerador de produtos de uma loja,
+mantendo só os K melhores num heap. TopK faz o mesmo aos poucos, conforme
+as lojas respondem, para montar o ranking global entre todos os sites.
+"""
+import heapq
+import itertools
+
+
+def price_of(product):
+    return product['preco']
+
+
+def cheapest(products, k):
+    """Os k produtos mais baratos do iterável, do menor para o maior preço"""
+    return heapq.nsmallest(k, products, key=price_of)
+
+
+class TopK:
+    """Os k produtos mais baratos vistos até agora (heap com no máximo k itens)"""
+
+    def __init__(self, k):
+        self.k = k
+        # (-preço, -ordem de chegada, produto): o topo é o mais caro e, no empate,
+        # o que chegou por último - é ele que sai quando entra alguém melhor
+        self._heap = []
+        self._arrival = itertools.count()
+
+    def push(self, product):
+        entry = (-product['preco'], -next(self._arrival), product)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def extend(self, products):
+        for product in products:
+            self.push(product)
+
+    def items(self):
+        """Do menor para o maior preço (no empate, quem chegou primeiro)"""
+        return [product for _, _, product in sorted(self._heap, reverse=True)]
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,126 @@
+"""Agendador de requisições por host, compartilhado por todas as buscas do processo.
+
+Cada host tem um token bucket. Quem pede uma vaga reserva o próximo token,
+mesmo que ele ainda não exista (o saldo fica negativo). Assim os pedidos são
+atendidos por ordem de chegada e ninguém fura a fila, venha de qual usuário
+vier. Respostas 429/503 ou páginas anti-robô reduzem a taxa do host pela
+metade e abrem uma pausa crescente; respostas boas devolvem a taxa aos poucos.
+"""
+import threading
+import time
+
+
+class HostBucket:
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+        self.throttled = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class RateLimited(Exception):
+    """A vaga para o host não sairia dentro do prazo da busca"""
+
+
+class HostScheduler:
+    def __init__(self, rate=2.0, burst=5, min_rate=0.1, max_backoff=120.0):
+        # rate: requisições por segundo por host; burst: rajada permitida
+        self.default_rate = rate
+        self.default_burst = burst
+        self.min_rate = min_rate
+        self.max_backoff = max_backoff
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = HostBucket(self.default_rate, self.default_burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    def configure(self, host, rate=None, burst=None):
+        """Define taxa e rajada de um host específico"""
+        with self._lock:
+            bucket = self._bucket(host)
+            if rate is not None:
+                bucket.base_rate = bucket.rate = rate
+            if burst is not None:
+                bucket.burst = bucket.tokens = burst
+
+    def acquire(self, host, timeout=None):
+        """Espera a vez do host; levanta RateLimited se a espera passaria de timeout"""
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            bucket.refill(now)
+            bucket.tokens -= 1
+
+            wait = max(0.0, -bucket.tokens / bucket.rate, bucket.blocked_until - now)
+            if timeout is not None and wait > timeout:
+                # Devolve a reserva: quem vem depois não precisa esperar por ela
+                bucket.tokens += 1
+                bucket.throttled += 1
+                raise RateLimited(f"{host}: próxima vaga em {wait:.1f}s")
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def report(self, host, status_code=None, blocked=False, retry_after=None):
+        """Ajusta a taxa do host de acordo com a resposta"""
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            if blocked or status_code in (429, 503):
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                bucket.backoff = min(self.max_backoff, bucket.backoff * 2 if bucket.backoff else 1.0)
+                pause = bucket.backoff
+                if retry_after is not None:
+                    pause = min(self.max_backoff, max(pause, retry_after))
+                bucket.blocked_until = max(bucket.blocked_until, now + pause)
+            elif status_code is not None and status_code < 400:
+                # Recupera 10% da taxa original a cada resposta boa
+                bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate * 0.1)
+                bucket.backoff = 0.0
+
+    def stats(self):
+        """Estado de cada host: taxa atual, pausa restante e pedidos recusados"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    'rate': round(bucket.rate, 3),
+                    'paused_for': round(max(0.0, bucket.blocked_until - now), 1),
+                    'throttled': bucket.throttled,
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+
+def parse_retry_after(value):
+    """Retry-After em segundos (a forma com data é ignorada)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Agendador do processo (sobrevive aos reruns do Streamlit)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = HostScheduler()
+        return _scheduler
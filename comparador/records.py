@@ -0,0 +1,172 @@
+"""Resultados em formato compacto, para quando são milhares ou milhões.
+
+Offer é um produto com os mesmos campos do dict de sempre ('site', 'produto',
+'preco', 'link'), mas em __slots__: sem o dict por objeto, ocupa bem menos.
+ResultBatch guarda muitos produtos em colunas: loja e consulta viram códigos
+inteiros (cada nome é guardado uma vez só) e os preços ficam num array de
+float64. to_frame() e to_arrow() reaproveitam esses arrays sem copiar.
+"""
+from array import array
+
+FIELDS = ('site', 'produto', 'preco', 'link')
+
+
+class Offer:
+    """Um produto encontrado; aceita offer['preco'] como o dict, para não mudar quem lê"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, site, produto, preco, link):
+        self.site = site
+        self.produto = produto
+        self.preco = preco
+        self.link = link
+
+    @classmethod
+    def from_dict(cls, product):
+        return cls(product['site'], product['produto'], product['preco'], product['link'])
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+
+    def get(self, field, default=None):
+        return getattr(self, field, default)
+
+    def __eq__(self, other):
+        if not isinstance(other, Offer):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in FIELDS)
+
+    def __repr__(self):
+        return f"Offer({self.site!r}, {self.produto!r}, {self.preco!r}, {self.link!r})"
+
+
+class Interner:
+    """Nome -> código inteiro, na ordem em que os nomes aparecem"""
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.codes = {name: code for code, name in enumerate(self.names)}
+
+    def code(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+
+class ResultBatch:
+    """Produtos em colunas: códigos de loja e consulta, títulos, preços (float64) e links"""
+
+    def __init__(self):
+        self.sites = Interner()
+        self.queries = Interner()
+        self.site_codes = array('i')
+        self.query_codes = array('i')
+        self.produtos = []
+        self.precos = array('d')
+        self.links = []
+
+    @classmethod
+    def from_products(cls, products, query=''):
+        batch = cls()
+        batch.extend(products, query)
+        return batch
+
+    @classmethod
+    def from_columns(cls, site_names, site_codes, produtos, precos, links, query_names=None, query_codes=None):
+        """Lote montado direto das colunas (códigos e preços podem ser arrays do NumPy)"""
+        batch = cls()
+        batch.sites = Interner(site_names)
+        batch.site_codes.frombytes(memoryview(site_codes).cast('B'))
+        batch.produtos = produtos
+        batch.precos.frombytes(memoryview(precos).cast('B'))
+        batch.links = links
+        if query_codes is None:
+            batch.queries = Interner([''])
+            batch.query_codes.frombytes(bytes(batch.query_codes.itemsize * len(batch.precos)))
+        else:
+            batch.queries = Interner(query_names)
+            batch.query_codes.frombytes(memoryview(query_codes).cast('B'))
+        return batch
+
+    def append(self, product, query=''):
+        self.site_codes.append(self.sites.code(product['site']))
+        self.query_codes.append(self.queries.code(query))
+        self.produtos.append(product['produto'])
+        self.precos.append(product['preco'])
+        self.links.append(product['link'])
+
+    def extend(self, products, query=''):
+        for product in products:
+            self.append(product, query)
+
+    def __len__(self):
+        return len(self.precos)
+
+    def __getitem__(self, i):
+        return Offer(self.sites.names[self.site_codes[i]], self.produtos[i], self.precos[i], self.links[i])
+
+    def __iter__(self):
+        site_names = self.sites.names
+        for code, produto, preco, link in zip(self.site_codes, self.produtos, self.precos, self.links):
+            yield Offer(site_names[code], produto, preco, link)
+
+    def query_of(self, i):
+        return self.queries.names[self.query_codes[i]]
+
+    def _categorical(self, codes, interner):
+        """Colunas categóricas do pandas, com as categorias em ordem alfabética"""
+        import numpy as np
+        import pandas as pd
+
+        names = np.array(interner.names, dtype=object)
+        order = np.argsort(names)
+        remap = np.empty(len(names), dtype=np.int32)
+        remap[order] = np.arange(len(names), dtype=np.int32)
+        return pd.Categorical.from_codes(remap[np.frombuffer(codes, dtype=np.int32)],
+                                         categories=names[order], validate=False)
+
+    def to_frame(self, with_query=False):
+        """DataFrame com site (e query) categóricos; o preço usa o mesmo buffer, sem cópia
+
+        Enquanto o DataFrame existir, o lote não pode crescer (o array avisa com BufferError).
+        """
+        import numpy as np
+        import pandas as pd
+
+        columns = {
+            'site': self._categorical(self.site_codes, self.sites),
+            'produto': pd.Series(self.produtos, dtype='str'),
+            'preco': np.frombuffer(self.precos, dtype=np.float64),
+            'link': pd.Series(self.links, dtype='str'),
+        }
+        if with_query:
+            columns = {'query': self._categorical(self.query_codes, self.queries), **columns}
+        return pd.DataFrame(columns, copy=False)
+
+    def to_arrow(self, with_query=False):
+        """Tabela do pyarrow com site (e query) como dicionário; códigos e preços sem cópia"""
+        import numpy as np
+        import pyarrow as pa
+
+        def dictionary(codes, interner):
+            return pa.DictionaryArray.from_arrays(pa.array(np.frombuffer(codes, dtype=np.int32)),
+                                                  pa.array(interner.names, type=pa.string()))
+
+        columns = {
+            'site': dictionary(self.site_codes, self.sites),
+            'produto': pa.array(self.produtos, type=pa.string()),
+            'preco': pa.array(np.frombuffer(self.precos, dtype=np.float64)),
+            'link': pa.array(self.links, type=pa.string()),
+        }
+        if with_query:
+            columns = {'query': dictionary(self.query_codes, self.queries), **columns}
+        return pa.table(columns)
@@ -0,0 +1,158 @@
+"""Cache de resultados em dois níveis: LRU em memória na frente de um SQLite em disco.
+
+A chave é (consulta na forma canônica, site). Cada site tem seu TTL; depois dele o
+resultado ainda é servido como "velho" por mais um tempo enquanto uma
+atualização roda em segundo plano (stale-while-revalidate).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .queries import normalize_query
+
+# .cache/ na raiz do projeto (fora do pacote)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+DEFAULT_PATH = os.path.join(CACHE_DIR, 'resultados.sqlite3')
+
+# Tempo (segundos) em que um resultado é considerado fresco, por site
+DEFAULT_TTLS = {
+    'Mercado Livre': 15 * 60,
+    'Buscapé': 15 * 60,
+    'Zoom': 15 * 60,
+    'Google Shopping': 5 * 60,
+}
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_PATH, max_entries=512, ttls=None,
+                 default_ttl=15 * 60, stale_ttl=60 * 60):
+        # stale_ttl: quanto tempo depois do TTL o resultado ainda pode ser servido
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+
+        self._memory = OrderedDict()  # (query, site) -> (valor, gravado_em)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cache-refresh')
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'refreshes': 0}
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    query TEXT NOT NULL,
+                    site TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (query, site)
+                )
+            """)
+            self._db.commit()
+
+    def get_ttl(self, site):
+        return self.ttls.get(site, self.default_ttl)
+
+    def _remember(self, key, value, stored_at):
+        self._memory[key] = (value, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, query, site):
+        """Retorna (valor, estado), com estado FRESH, STALE ou None quando não há nada útil"""
+        key = (normalize_query(query), site)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+            elif self._db is not None:
+                row = self._db.execute(
+                    "SELECT payload, stored_at FROM results WHERE query = ? AND site = ?", key
+                ).fetchone()
+                if row:
+                    entry = (json.loads(row[0]), row[1])
+                    self._remember(key, *entry)
+                    self.stats['disk_hits'] += 1
+
+            if entry is None:
+                self.stats['misses'] += 1
+                return None, None
+
+        value, stored_at = entry
+        age = time.time() - stored_at
+        ttl = self.get_ttl(site)
+        if age <= ttl:
+            return value, FRESH
+        if age <= ttl + self.stale_ttl:
+            return value, STALE
+        return None, None
+
+    def set(self, query, site, value):
+        key = (normalize_query(query), site)
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, value, stored_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (query, site, payload, stored_at) VALUES (?, ?, ?, ?)",
+                    (*key, json.dumps(value), stored_at)
+                )
+                self._db.commit()
+
+    def queries(self):
+        """[(consulta, horário do resultado mais novo)] de tudo que está no cache em disco"""
+        if self._db is None:
+            with self._lock:
+                newest = {}
+                for (query, _), (_, stored_at) in self._memory.items():
+                    newest[query] = max(stored_at, newest.get(query, 0))
+                return list(newest.items())
+        with self._lock:
+            return self._db.execute("SELECT query, MAX(stored_at) FROM results GROUP BY query").fetchall()
+
+    def refresh_in_background(self, query, site, fetch):
+        """Atualiza uma entrada velha sem bloquear quem pediu (uma atualização por chave)"""
+        key = (normalize_query(query), site)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.stats['refreshes'] += 1
+
+        def refresh():
+            try:
+                value = fetch(query)
+                if value:
+                    self.set(query, site, value)
+            except Exception as e:
+                print(f"Erro ao atualizar cache de {site}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(refresh)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Cache compartilhado pelo processo (sobrevive aos reruns do Streamlit)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
@@ -0,0 +1,174 @@
+"""Catálogo sintético com semente: produtos de mentira, mas com preços plausíveis e sempre os mesmos.
+
+Cada categoria tem um preço mediano e uma dispersão (log-normal), cada loja
+um viés de preço e alguns anúncios são acessórios baratos ("Capa para ...").
+Serve para três coisas:
+
+- generate(): milhões de linhas consulta/loja/preço numa passada só de
+  NumPy, num ResultBatch, para testar análise, tabela e armazenamento em
+  escala;
+- searcher(): função de busca no lugar das lojas de verdade
+  (PriceComparator(synthetic_seed=...) ou COMPARADOR_SYNTHETIC_SEED);
+- offers(): as ofertas simuladas da demonstração e do Google Shopping.
+
+A mesma semente gera os mesmos números; numa busca, o preço depende só da
+semente, da consulta e da loja.
+"""
+import zlib
+from urllib.parse import quote_plus
+
+from .queries import normalize_query
+from .records import ResultBatch
+
+# Palavras-chave da consulta, preço mediano (R$), dispersão (desvio do log) e peso no catálogo
+CATEGORIES = [
+    {'name': 'iphone', 'keywords': ('iphone',), 'median': 3500, 'spread': 0.30, 'weight': 6,
+     'kinds': ('iPhone',), 'brands': ('Apple',)},
+    {'name': 'smartphone', 'keywords': ('samsung', 'galaxy', 'motorola', 'xiaomi', 'celular', 'smartphone'),
+     'median': 1800, 'spread': 0.45, 'weight': 14,
+     'kinds': ('Smartphone', 'Celular'), 'brands': ('Samsung', 'Motorola', 'Xiaomi', 'Realme')},
+    {'name': 'notebook', 'keywords': ('notebook', 'laptop', 'macbook'), 'median': 2800, 'spread': 0.35,
+     'weight': 10, 'kinds': ('Notebook',), 'brands': ('Dell', 'Lenovo', 'Acer', 'Asus', 'HP')},
+    {'name': 'tv', 'keywords': ('tv', 'televis'), 'median': 1800, 'spread': 0.40, 'weight': 8,
+     'kinds': ('Smart TV',), 'brands': ('LG', 'Samsung', 'TCL', 'Philco')},
+    {'name': 'monitor', 'keywords': ('monitor',), 'median': 900, 'spread': 0.35, 'weight': 6,
+     'kinds': ('Monitor',), 'brands': ('LG', 'Samsung', 'AOC', 'Dell')},
+    {'name': 'fone', 'keywords': ('fone', 'headset', 'airpods'), 'median': 200, 'spread': 0.60, 'weight': 12,
+     'kinds': ('Fone Bluetooth', 'Headset'), 'brands': ('JBL', 'Sony', 'Edifier', 'QCY')},
+    {'name': 'mouse', 'keywords': ('mouse',), 'median': 80, 'spread': 0.55, 'weight': 10,
+     'kinds': ('Mouse', 'Mouse Gamer'), 'brands': ('Logitech', 'Redragon', 'Razer')},
+    {'name': 'teclado', 'keywords': ('teclado',), 'median': 150, 'spread': 0.50, 'weight': 8,
+     'kinds': ('Teclado', 'Teclado Mecânico'), 'brands': ('Logitech', 'Redragon', 'HyperX')},
+    {'name': 'default', 'keywords': (), 'median': 300, 'spread': 0.80, 'weight': 26,
+     'kinds': ('Cafeteira', 'Air Fryer', 'Liquidificador', 'Ventilador'), 'brands': ('Mondial', 'Philco', 'Arno')},
+]
+
+# Viés de preço de cada loja e onde fica a busca dela
+SITES = {
+    'Mercado Livre': (0.97, 'https://lista.mercadolivre.com.br/{query}'),
+    'Amazon': (1.00, 'https://www.amazon.com.br/s?k={query}'),
+    'Magazine Luiza': (1.02, 'https://www.magazineluiza.com.br/busca/{query}'),
+    'Casas Bahia': (1.04, 'https://www.casasbahia.com.br/busca/{query}'),
+    'Buscapé': (0.99, 'https://www.buscape.com.br/search?q={query}'),
+    'Zoom': (0.98, 'https://www.zoom.com.br/search?q={query}'),
+    'Google Shopping': (1.01, 'https://www.google.com/search?tbm=shop&q={query}'),
+}
+
+
+def category_of(query):
+    """Categoria pela primeira palavra-chave que aparece na consulta (como nas tabelas antigas)"""
+    query = query.lower()
+    for category in CATEGORIES:
+        if any(keyword in query for keyword in category['keywords']):
+            return category
+    return CATEGORIES[-1]
+
+
+class SyntheticCatalog:
+    def __init__(self, seed=0, noise=0.12, accessory_rate=0.1, popularity=1.1):
+        self.seed = seed
+        # Variação de preço entre anúncios do mesmo produto (desvio do log)
+        self.noise = noise
+        # Fração de anúncios que são acessórios do produto, bem mais baratos
+        self.accessory_rate = accessory_rate
+        # Expoente de Zipf: poucas consultas concentram a maior parte das linhas
+        self.popularity = popularity
+        self.site_names = list(SITES)
+
+    def _rng(self, *parts):
+        """Gerador que só depende da semente e das partes (crc32: estável entre processos)"""
+        import numpy as np
+
+        return np.random.default_rng([self.seed, zlib.crc32('\x1f'.join(parts).encode('utf-8'))])
+
+    def base_price(self, query):
+        """Preço de referência da consulta, igual em todas as lojas"""
+        category = category_of(query)
+        rng = self._rng('base', normalize_query(query))
+        return category['median'] * float(rng.lognormal(0.0, category['spread']))
+
+    def offers(self, query, site, count, accessories=True):
+        """`count` ofertas da consulta numa loja, em ordem de página (não de preço)"""
+        import numpy as np
+
+        rng = self._rng('offers', normalize_query(query), site)
+        factor, url = SITES.get(site, (1.0, SITES['Google Shopping'][1]))
+        prices = self.base_price(query) * factor * rng.lognormal(0.0, self.noise, count)
+        is_accessory = rng.random(count) < (self.accessory_rate if accessories else 0.0)
+        prices = np.where(is_accessory, prices * rng.uniform(0.02, 0.1, count), prices)
+        prices = np.maximum(prices.round(2), 0.01)
+
+        link = url.format(query=quote_plus(query))
+        return [{
+            'site': site,
+            'produto': f"Capa para {query}" if accessory else f"{query} - Oferta...",
+            'preco': price,
+            'link': link,
+        } for price, accessory in zip(prices.tolist(), is_accessory.tolist())]
+
+    def searcher(self, site, count):
+        """Função de busca da loja para o PriceComparator: produto -> gerador de ofertas"""
+        def search(product):
+            yield from self.offers(product, site, count)
+        search.__name__ = f"search_synthetic_{site}"
+        return search
+
+    def queries(self, count, rng):
+        """(nomes, índice da categoria) de `count` consultas, sorteadas pelo peso das categorias"""
+        import numpy as np
+
+        weights = np.array([category['weight'] for category in CATEGORIES], dtype=np.float64)
+        categories = rng.choice(len(CATEGORIES), size=count, p=weights / weights.sum())
+        kinds = rng.integers(0, 1 << 30, count)
+        brands = rng.integers(0, 1 << 30, count)
+        models = rng.integers(10, 10_000, count)
+        letters = rng.integers(0, 26, count)
+
+        names = []
+        for i, (c, kind, brand, model, letter) in enumerate(zip(categories.tolist(), kinds.tolist(),
+                                                                brands.tolist(), models.tolist(),
+                                                                letters.tolist())):
+            category = CATEGORIES[c]
+            names.append(f"{category['kinds'][kind % len(category['kinds'])]} "
+                         f"{category['brands'][brand % len(category['brands'])]} "
+                         f"{chr(65 + letter)}{model}-{i}")
+        return names, categories
+
+    def generate(self, rows, queries=None):
+        """ResultBatch com `rows` ofertas de `queries` consultas (padrão: uma para cada 200 linhas)"""
+        import numpy as np
+
+        rng = self._rng('catalog')
+        queries = queries or max(1, rows // 200)
+        names, categories = self.queries(queries, rng)
+
+        medians = np.array([category['median'] for category in CATEGORIES], dtype=np.float64)
+        spreads = np.array([category['spread'] for category in CATEGORIES], dtype=np.float64)
+        base = medians[categories] * np.exp(rng.normal(0.0, 1.0, queries) * spreads[categories])
+
+        # Popularidade de Zipf para as consultas; lojas sorteadas por igual
+        popularity = 1.0 / np.arange(1, queries + 1) ** self.popularity
+        query_codes = rng.choice(queries, size=rows, p=popularity / popularity.sum()).astype(np.int32)
+        site_codes = rng.integers(0, len(self.site_names), rows, dtype=np.int32)
+        factors = np.array([SITES[site][0] for site in self.site_names], dtype=np.float64)
+
+        prices = base[query_codes] * factors[site_codes] * rng.lognormal(0.0, self.noise, rows)
+        is_accessory = rng.random(rows) < self.accessory_rate
+        prices = np.where(is_accessory, prices * rng.uniform(0.02, 0.1, rows), prices)
+        prices = np.maximum(prices.round(2), 0.01)
+
+        # Títulos e links saem de tabelas pequenas: as linhas só apontam para os mesmos textos
+        titles = np.empty((2, queries), dtype=object)
+        titles[0] = [f"{name} - Oferta..." for name in names]
+        titles[1] = [f"Capa para {name}" for name in names]
+        links = np.empty((len(self.site_names), queries), dtype=object)
+        for s, site in enumerate(self.site_names):
+            links[s] = [SITES[site][1].format(query=quote_plus(name)) for name in names]
+
+        return ResultBatch.from_columns(
+            self.site_names, site_codes,
+            titles[is_accessory.astype(np.intp), query_codes].tolist(),
+            prices,
+            links[site_codes, query_codes].tolist(),
+            query_names=names, query_codes=query_codes,
+        )
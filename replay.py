@@ -0,0 +1,109 @@
+"""Roda os extratores de novo sobre as páginas arquivadas, sem internet.
+
+Uso:
+    python replay.py                      # a última página de cada URL, todas as lojas
+    python replay.py --site Zoom --days 7
+    python replay.py --update             # grava a nova extração (os próximos 304 usam ela)
+    python replay.py --workers 8          # extrai em 8 processos
+    python replay.py --stats
+    python replay.py --prune 30           # apaga downloads com mais de 30 dias
+
+Para cada loja mostra quantas páginas ainda dão produto e quantas mudaram em
+relação à extração guardada na hora do download. Página que dava produto e
+agora dá zero é seletor quebrado: o comando termina com código 1. Com
+--workers as páginas são extraídas num pool de processos, uma por núcleo.
+"""
+import argparse
+import sys
+import time
+from collections import defaultdict
+
+from comparador import PriceComparator
+from comparador.extraction import SITE_RULES, ExtractionPool
+from comparador.page_archive import DAY, PageArchive, DEFAULT_PATH
+
+
+def replay(archive, comparator, site=None, since=None, update=False):
+    """{loja: contadores} da nova extração das páginas arquivadas"""
+    summary = defaultdict(lambda: {'pages': 0, 'products': 0, 'empty': 0, 'broken': 0, 'changed': 0})
+    # (loja, conteúdo, URL, sha256), lidos do arquivo só quando a extração precisa deles
+    jobs = ((site_name, archive.page(sha256), url, sha256)
+            for site_name, url, sha256, _ in archive.latest_pages(site, since) if site_name in SITE_RULES)
+    if comparator.extraction_pool:
+        results = comparator.extraction_pool.imap(jobs)
+    else:
+        results = ((job, comparator.extract(*job[:3])) for job in jobs)
+
+    for (site_name, _, url, sha256), products in results:
+        before = archive.products(url, sha256)
+        stats = summary[site_name]
+        stats['pages'] += 1
+        stats['products'] += len(products)
+        if not products:
+            stats['empty'] += 1
+            if before:
+                stats['broken'] += 1
+                print(f"  {site_name}: a extração parou de achar produtos em {url}")
+        if before is not None and before != products:
+            stats['changed'] += 1
+        if update:
+            archive.save_products(url, sha256, products)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extrai de novo as páginas arquivadas (sem internet)")
+    parser.add_argument('--archive', default=DEFAULT_PATH, help="Arquivo SQLite das páginas")
+    parser.add_argument('--site', help="Só uma loja (ex: 'Mercado Livre')")
+    parser.add_argument('--days', type=float, help="Só páginas baixadas nos últimos N dias")
+    parser.add_argument('--update', action='store_true', help="Guarda a nova extração no arquivo")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Processos de extração (0 extrai no próprio processo)")
+    parser.add_argument('--stats', action='store_true', help="Mostra o tamanho do arquivo e sai")
+    parser.add_argument('--prune', type=float, metavar='DIAS', help="Apaga downloads mais antigos e sai")
+    args = parser.parse_args(argv)
+
+    archive = PageArchive(args.archive)
+    pool = None
+    try:
+        if args.prune is not None:
+            removed = archive.prune(older_than_days=args.prune)
+            print(f"{removed} páginas removidas")
+            return
+        if args.stats:
+            stats = archive.stats()
+            ratio = stats['stored_bytes'] / stats['size_bytes'] * 100 if stats['size_bytes'] else 0
+            print(f"{stats['pages']} páginas diferentes em {stats['fetches']} downloads "
+                  f"({stats['not_modified']} respondidos com 304)")
+            print(f"{stats['size_bytes'] / 1e6:.1f} MB de HTML guardados em {stats['stored_bytes'] / 1e6:.1f} MB "
+                  f"({ratio:.0f}%)")
+            return
+
+        since = time.time() - args.days * DAY if args.days else None
+        pool = ExtractionPool(args.workers) if args.workers else None
+        comparator = PriceComparator(use_cache=False, use_history=False, use_archive=False, extraction_pool=pool)
+        start = time.perf_counter()
+        summary = replay(archive, comparator, site=args.site, since=since, update=args.update)
+        elapsed = time.perf_counter() - start
+    finally:
+        if pool:
+            pool.close()
+        archive.close()
+
+    if not summary:
+        print("Nenhuma página arquivada")
+        return
+    broken = pages = 0
+    for site_name, stats in sorted(summary.items()):
+        broken += stats['broken']
+        pages += stats['pages']
+        print(f"{site_name:<14} {stats['pages']:>5} páginas | {stats['products']:>6} produtos | "
+              f"{stats['empty']} sem produto ({stats['broken']} quebradas) | {stats['changed']} mudaram")
+    print(f"{pages} páginas em {elapsed:.2f}s ({pages / elapsed if elapsed else 0:.1f} páginas/s, "
+          f"{args.workers or 1} processo(s) de extração)")
+    if broken:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+"""Acompanhamento contínuo de uma lista de produtos, sem o Streamlit.
+
+Uso:
+    python watchlist.py lista.csv
+    python watchlist.py lista.jsonl --interval 30 --drop 15 --alerts alertas.sqlite3
+    python watchlist.py lista.csv --once        # uma rodada só (ex: no cron)
+    python watchlist.py --pending               # mostra os alertas ainda não lidos
+
+A lista é um CSV ou JSONL com "query" e, opcionalmente, "id", "intervalo"
+(minutos entre buscas) e "preco_alvo". Cada produto é buscado de novo no seu
+intervalo. Os produtos de cada loja viram um hash: se nada mudou desde a
+última busca, não há o que gravar nem avaliar, e o intervalo do item cresce;
+quando muda, o intervalo encolhe e o item passa na frente dos que empatam no
+horário. Quedas de preço viram alertas numa fila SQLite.
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from comparador import PriceComparator
+from comparador.matching import query_filter
+from comparador.ranking import price_of
+
+DEFAULT_ALERTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'alertas.sqlite3')
+
+# Preço simulado (não é de uma loja de verdade): geraria alertas falsos
+SKIP_SITES = PriceComparator.SIMULATED_SITES
+
+
+class WatchItem:
+    def __init__(self, item_id, query, interval, target_price=None):
+        self.id = item_id
+        self.query = query
+        self.base_interval = interval
+        self.interval = interval
+        self.target_price = target_price
+        # Só anúncios do produto buscado contam para os alertas (capas e outros modelos não)
+        self.is_wanted = query_filter(query)
+
+        self.next_run = 0.0
+        self.runs = 0
+        self.page_hashes = {}   # site -> hash dos produtos da última busca
+        self.site_best = {}     # site -> anúncio do produto mais barato da última busca
+        self.best_price = None
+        # Média móvel das buscas que trouxeram mudança (0 = nunca muda, 1 = sempre)
+        self.volatility = 0.0
+
+
+def read_watchlist(path, default_interval):
+    """Lê os itens do CSV ou JSONL (intervalo em minutos)"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    items = []
+    for line_number, row in enumerate(rows, 1):
+        query = (row.get('query') or row.get('produto') or '').strip()
+        if not query:
+            continue
+        target = row.get('preco_alvo')
+        items.append(WatchItem(
+            str(row.get('id') or line_number),
+            query,
+            float(row.get('intervalo') or default_interval) * 60,
+            float(target) if target not in (None, '') else None,
+        ))
+    return items
+
+
+def products_hash(products):
+    """Hash do que importa na página: produto, preço e link de cada item"""
+    payload = json.dumps([(p['produto'], p['preco'], p['link']) for p in products], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class AlertSink:
+    """Fila de alertas em SQLite: quem consome lê os pendentes e marca como entregues"""
+
+    def __init__(self, path=DEFAULT_ALERTS_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                item_id TEXT NOT NULL,
+                query TEXT NOT NULL,
+                site TEXT NOT NULL,
+                produto TEXT NOT NULL,
+                preco REAL NOT NULL,
+                link TEXT,
+                motivo TEXT NOT NULL,
+                delivered INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS alerts_pending ON alerts (delivered, id);
+        """)
+        self._db.commit()
+
+    def push(self, item, product, reason):
+        with self._db:
+            self._db.execute(
+                "INSERT INTO alerts (created_at, item_id, query, site, produto, preco, link, motivo) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), item.id, item.query, product['site'], product['produto'],
+                 product['preco'], product['link'], reason)
+            )
+
+    def pending(self, limit=100):
+        cursor = self._db.execute(
+            "SELECT id, created_at, item_id, query, site, produto, preco, link, motivo "
+            "FROM alerts WHERE delivered = 0 ORDER BY id LIMIT ?", (limit,)
+        )
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def mark_delivered(self, alert_ids):
+        with self._db:
+            self._db.executemany("UPDATE alerts SET delivered = 1 WHERE id = ?", [(i,) for i in alert_ids])
+
+    def close(self):
+        self._db.close()
+
+
+class WatchScheduler:
+    def __init__(self, comparator, items, sink, concurrency=8, drop_percent=10.0):
+        self.comparator = comparator
+        self.items = items
+        self.sink = sink
+        self.concurrency = concurrency
+        self.drop_percent = drop_percent
+        self.sites = [(site_name, search_func) for site_name, search_func in comparator.get_search_functions()
+                      if site_name not in SKIP_SITES]
+
+        # (próxima busca, -volatilidade, ordem, item): no empate, quem muda mais vai antes
+        self._queue = []
+        self._order = itertools.count()
+        # As buscas usam requests (bloqueante): rodam em threads, o loop só coordena
+        self._executor = ThreadPoolExecutor(max_workers=concurrency * max(1, len(self.sites)),
+                                            thread_name_prefix='watchlist')
+        self.stats = {'checks': 0, 'changed': 0, 'unchanged': 0, 'alerts': 0}
+
+    def schedule(self, item):
+        heapq.heappush(self._queue, (item.next_run, -item.volatility, next(self._order), item))
+
+    async def run(self, once=False):
+        """Roda até ser interrompido (once=True: cada item uma vez)"""
+        self.once = once
+        for item in self.items:
+            self.schedule(item)
+
+        running = set()
+        try:
+            while self._queue or running:
+                now = time.time()
+                while self._queue and self._queue[0][0] <= now and len(running) < self.concurrency:
+                    item = heapq.heappop(self._queue)[-1]
+                    running.add(asyncio.create_task(self.check(item)))
+
+                if not running:
+                    await asyncio.sleep(self._queue[0][0] - now)
+                    continue
+
+                # Acorda quando uma busca termina ou quando o próximo item vence
+                timeout = None
+                if self._queue and len(running) < self.concurrency:
+                    timeout = max(0.0, self._queue[0][0] - now)
+                done, running = await asyncio.wait(running, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception():
+                        print(f"Erro no acompanhamento: {task.exception()}")
+        finally:
+            for task in running:
+                task.cancel()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def check(self, item):
+        """Busca o item em todas as lojas e processa só o que mudou"""
+        loop = asyncio.get_running_loop()
+        started_at = time.time()
+        searches = [
+            asyncio.wait_for(
+                loop.run_in_executor(self._executor, self.comparator.run_search, site_name, search_func, item.query),
+                timeout=self.comparator.get_timeout(site_name),
+            )
+            for site_name, search_func in self.sites
+        ]
+        outcomes = await asyncio.gather(*searches, return_exceptions=True)
+
+        changed = []
+        try:
+            for (site_name, _), products in zip(self.sites, outcomes):
+                # Erro, timeout ou página vazia: fica valendo o que já se sabia da loja
+                if isinstance(products, BaseException) or not products:
+                    continue
+                digest = products_hash(products)
+                if item.page_hashes.get(site_name) == digest:
+                    continue
+                item.page_hashes[site_name] = digest
+                changed.append((site_name, products))
+
+            self.stats['checks'] += 1
+            self.stats['changed' if changed else 'unchanged'] += 1
+            if changed:
+                self.record(item, changed, started_at)
+        finally:
+            self.reschedule(item, bool(changed))
+
+    def record(self, item, changed, started_at):
+        for site_name, products in changed:
+            # Os produtos vêm do mais barato para o mais caro
+            site_best = next(filter(item.is_wanted, products), None)
+            if site_best:
+                item.site_best[site_name] = site_best
+            else:
+                item.site_best.pop(site_name, None)
+            if self.comparator.cache:
+                self.comparator.cache.set(item.query, site_name, products)
+
+        best = min(item.site_best.values(), key=price_of) if item.site_best else None
+        # Avalia antes de gravar: o histórico comparado é o de antes desta busca
+        reasons = self.alert_reasons(item, best, started_at) if best else []
+
+        if self.comparator.history:
+            # Como no search_and_cache: o histórico só guarda anúncios do produto acompanhado
+            for _, products in changed:
+                wanted = list(filter(item.is_wanted, products))
+                if wanted:
+                    self.comparator.history.append(item.query, wanted)
+        if best:
+            item.best_price = best['preco']
+
+        for reason in reasons:
+            self.sink.push(item, best, reason)
+            self.stats['alerts'] += 1
+            print(f"🔔 {item.query}: R$ {best['preco']:.2f} no {best['site']} - {reason}")
+
+    def alert_reasons(self, item, best, started_at):
+        """Motivos de alerta, nos moldes do analyze_deals"""
+        price = best['preco']
+        reasons = []
+
+        # Só na hora em que cruza o alvo, não a cada busca abaixo dele
+        if item.target_price is not None and price <= item.target_price \
+                and (item.best_price is None or item.best_price > item.target_price):
+            reasons.append(f"abaixo do preço alvo de R$ {item.target_price:.2f}")
+
+        if item.best_price and price < item.best_price * (1 - self.drop_percent / 100):
+            drop = (item.best_price - price) / item.best_price * 100
+            reasons.append(f"caiu {drop:.1f}% (antes R$ {item.best_price:.2f})")
+
+        history = self.comparator.history_stats(item.query, before=started_at).get(30)
+        if history and price < history['min']:
+            reasons.append(f"menor preço dos últimos 30 dias (mínimo anterior R$ {history['min']:.2f})")
+
+        return reasons
+
+    def reschedule(self, item, changed):
+        # A primeira busca só define a referência: não conta como mudança
+        if item.runs:
+            item.volatility = 0.7 * item.volatility + 0.3 * (1.0 if changed else 0.0)
+            if changed:
+                item.interval = max(item.base_interval / 4, item.interval / 2)
+            else:
+                item.interval = min(item.base_interval * 8, item.interval * 1.5)
+        item.runs += 1
+        item.next_run = time.time() + item.interval
+        if not self.once:
+            self.schedule(item)
+
+
+def show_pending(sink):
+    alerts = sink.pending()
+    if not alerts:
+        print("Nenhum alerta pendente")
+        return
+    for alert in alerts:
+        when = time.strftime('%d/%m %H:%M', time.localtime(alert['created_at']))
+        print(f"[{when}] {alert['query']}: R$ {alert['preco']:.2f} no {alert['site']} - {alert['motivo']}")
+        print(f"          {alert['link']}")
+    sink.mark_delivered([alert['id'] for alert in alerts])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Acompanha preços de uma lista de produtos (sem Streamlit)")
+    parser.add_argument('watchlist', nargs='?', help="CSV ou JSONL com os produtos")
+    parser.add_argument('--interval', type=float, default=60, help="Minutos entre buscas (padrão dos itens)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Produtos buscados ao mesmo tempo")
+    parser.add_argument('--drop', type=float, default=10.0, help="Queda (%%) que gera alerta")
+    parser.add_argument('--alerts', default=DEFAULT_ALERTS_PATH, help="Fila SQLite dos alertas")
+    parser.add_argument('--once', action='store_true', help="Busca cada item uma vez e sai")
+    parser.add_argument('--pending', action='store_true', help="Mostra os alertas pendentes e sai")
+    args = parser.parse_args(argv)
+
+    sink = AlertSink(args.alerts)
+    if args.pending:
+        show_pending(sink)
+        sink.close()
+        return
+    if not args.watchlist:
+        parser.error("informe a lista de produtos")
+
+    items = read_watchlist(args.watchlist, args.interval)
+    scheduler = WatchScheduler(PriceComparator(), items, sink,
+                               concurrency=args.concurrency, drop_percent=args.drop)
+    print(f"Acompanhando {len(items)} produtos em {len(scheduler.sites)} lojas")
+
+    start = time.monotonic()
+    try:
+        asyncio.run(scheduler.run(once=args.once))
+    except KeyboardInterrupt:
+        print("\nInterrompido")
+    finally:
+        sink.close()
+
+    stats = scheduler.stats
+    print(f"\nBuscas: {stats['checks']} em {time.monotonic() - start:.0f}s "
+          f"({stats['changed']} com mudança, {stats['unchanged']} iguais) | alertas: {stats['alerts']}")
+
+
+if __name__ == '__main__':
+    main()